@@ -0,0 +1,148 @@
+"""
+Journal d'accès structuré (une ligne JSON par requête), écrit hors du chemin des requêtes.
+
+Les requêtes ne font que déposer l'enregistrement dans une file bornée (`QueueHandler`);
+un `QueueListener` l'écrit sur la sortie standard depuis son propre thread. Si la file
+est pleine, l'enregistrement est abandonné (compteur `access_log.dropped`) plutôt que
+de bloquer la requête.
+
+Champs: méthode, modèle de route (`/readings/{date_str}`), statut, latence, temps
+passé en base, cache (hit/miss), octets de la réponse. Les réponses en succès peuvent
+être échantillonnées (`ACCESS_LOG_SAMPLE_RATE`); les erreurs (>= 400) sont toujours
+journalisées.
+"""
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+from sqlalchemy import event
+
+from database import all_engines
+from metrics import metrics
+
+ACCESS_LOG_ENABLED = os.getenv("ACCESS_LOG_ENABLED", "1").lower() in ("1", "true", "yes")
+ACCESS_LOG_SAMPLE_RATE = float(os.getenv("ACCESS_LOG_SAMPLE_RATE", "1"))
+ACCESS_LOG_QUEUE_SIZE = int(os.getenv("ACCESS_LOG_QUEUE_SIZE", "10000"))
+
+
+@dataclass
+class RequestStats:
+    """Mesures accumulées pendant une requête (partagées avec les threads du pool)."""
+    db_time: float = 0.0
+    db_queries: int = 0
+    cache: Optional[str] = None
+
+
+# Objet mutable: les threads du pool reçoivent une copie du contexte mais le même objet
+request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def note_cache(hit: bool) -> None:
+    """Indique si la réponse de la requête courante vient du cache."""
+    stats = request_stats.get()
+    if stats is not None and stats.cache != "miss":
+        stats.cache = "hit" if hit else "miss"
+
+
+# Début de la requête rangé sur son contexte d'exécution (un par instruction): une requête
+# en erreur ne laisse rien sur la connexion du pool qui fausserait les suivantes
+def _query_started(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context.query_started = time.perf_counter()
+
+
+def _record_query(context) -> None:
+    started = getattr(context, "query_started", None)
+    if started is None:
+        return
+    del context.query_started
+    stats = request_stats.get()
+    if stats is not None:
+        stats.db_time += time.perf_counter() - started
+        stats.db_queries += 1
+
+
+def _query_finished(conn, cursor, statement, parameters, context, executemany):
+    _record_query(context)
+
+
+def _query_failed(exception_context):
+    # Le temps passé par une requête en erreur compte aussi dans le temps base de la requête HTTP
+    _record_query(exception_context.execution_context)
+
+
+# Base principale et réplicas en lecture. handle_error en tête de liste: celui du disjoncteur
+# lève DatabaseUnavailable, ce qui interrompt les écouteurs suivants
+for _engine in all_engines:
+    event.listen(_engine, "before_cursor_execute", _query_started)
+    event.listen(_engine, "after_cursor_execute", _query_finished)
+    event.listen(_engine, "handle_error", _query_failed, insert=True)
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = getattr(record, "access", None) or {"message": record.getMessage()}
+        return json.dumps({"time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(), **entry}, ensure_ascii=False)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler qui n'attend jamais: file pleine = enregistrement abandonné."""
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            metrics.incr("access_log.dropped")
+
+
+access_logger = logging.getLogger("api.access")
+access_logger.propagate = False
+access_logger.setLevel(logging.INFO)
+
+
+def start_listener() -> Optional[QueueListener]:
+    """Branche le logger d'accès sur la file et démarre le thread d'écriture."""
+    if not ACCESS_LOG_ENABLED:
+        return None
+    log_queue: queue.Queue = queue.Queue(maxsize=ACCESS_LOG_QUEUE_SIZE)
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(JsonFormatter())
+    access_logger.handlers = [DroppingQueueHandler(log_queue)]
+    listener = QueueListener(log_queue, stream, respect_handler_level=False)
+    listener.start()
+    return listener
+
+
+def stop_listener(listener: Optional[QueueListener]) -> None:
+    """Vide la file et arrête le thread d'écriture."""
+    if listener is not None:
+        listener.stop()
+        access_logger.handlers = []
+
+
+def should_log(status_code: int) -> bool:
+    return status_code >= 400 or ACCESS_LOG_SAMPLE_RATE >= 1 or random.random() < ACCESS_LOG_SAMPLE_RATE
+
+
+def log_request(method: str, route: str, status_code: int, latency: float, stats: RequestStats, response_bytes: Optional[int]) -> None:
+    if not access_logger.handlers or not should_log(status_code):
+        return
+    access_logger.info("access", extra={"access": {
+        "method": method,
+        "route": route,
+        "status": status_code,
+        "latency_ms": round(latency * 1000, 2),
+        "db_ms": round(stats.db_time * 1000, 2),
+        "db_queries": stats.db_queries,
+        "cache": stats.cache,
+        "bytes": response_bytes,
+    }})
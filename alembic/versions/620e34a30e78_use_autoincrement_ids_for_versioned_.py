@@ -0,0 +1,41 @@
+"""Use AUTOINCREMENT ids for versioned tables on SQLite
+
+Revision ID: 620e34a30e78
+Revises: a258fc1d8407
+Create Date: 2026-10-19 12:01:33.636907
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '620e34a30e78'
+down_revision: Union[str, Sequence[str], None] = 'a258fc1d8407'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Tables versionnées (synchronisées par /sync)
+VERSIONED_TABLES = ("months", "days", "readings", "books")
+
+
+def rebuild(autoincrement: bool) -> None:
+    # SQLite ne modifie pas AUTOINCREMENT en place: recréer chaque table (données et index copiés)
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    for table in VERSIONED_TABLES:
+        with op.batch_alter_table(table, recreate="always", table_kwargs={"sqlite_autoincrement": autoincrement}):
+            pass
+
+
+def upgrade() -> None:
+    """Never reuse ids of deleted rows on SQLite (PostgreSQL sequences already don't)."""
+    rebuild(True)
+
+
+def downgrade() -> None:
+    """Go back to rowid ids on SQLite."""
+    rebuild(False)
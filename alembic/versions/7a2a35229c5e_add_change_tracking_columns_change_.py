@@ -0,0 +1,60 @@
+"""Add change tracking columns, change clock and tombstones
+
+Revision ID: 7a2a35229c5e
+Revises: 9a2742b6ff58
+Create Date: 2026-10-19 11:17:09.749514
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a2a35229c5e'
+down_revision: Union[str, Sequence[str], None] = '9a2742b6ff58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+VERSIONED_TABLES = ('months', 'days', 'readings', 'books')
+
+
+def upgrade() -> None:
+    """Add version/updated_at to synced tables, the global change clock and tombstones."""
+    for table in VERSIONED_TABLES:
+        op.add_column(table, sa.Column('version', sa.BigInteger(), nullable=True))
+        op.add_column(table, sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True))
+        op.create_index(op.f(f'ix_{table}_version'), table, ['version'], unique=False)
+        # Les lignes existantes font partie de la première synchronisation (version 1)
+        op.execute(sa.text(f"UPDATE {table} SET version = 1, updated_at = CURRENT_TIMESTAMP"))
+
+    op.create_table('change_clock',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('value', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.execute(sa.text("INSERT INTO change_clock (id, value) VALUES (1, 1)"))
+
+    op.create_table('tombstones',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('table_name', sa.String(length=50), nullable=False),
+        sa.Column('row_id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.BigInteger(), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_tombstones_version'), 'tombstones', ['version'], unique=False)
+
+
+def downgrade() -> None:
+    """Drop change tracking."""
+    op.drop_index(op.f('ix_tombstones_version'), table_name='tombstones')
+    op.drop_table('tombstones')
+    op.drop_table('change_clock')
+    for table in reversed(VERSIONED_TABLES):
+        op.drop_index(op.f(f'ix_{table}_version'), table_name=table)
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column('updated_at')
+            batch_op.drop_column('version')
@@ -0,0 +1,34 @@
+"""Add day_payloads read model table
+
+Revision ID: 9a2742b6ff58
+Revises: d5f4e8ea8e82
+Create Date: 2026-10-19 11:15:34.765821
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a2742b6ff58'
+down_revision: Union[str, Sequence[str], None] = 'd5f4e8ea8e82'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create the day_payloads read model (fill it with `python rebuild_day_payloads.py`)."""
+    op.create_table('day_payloads',
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('body', sa.LargeBinary(), nullable=False),
+        sa.Column('body_gzip', sa.LargeBinary(), nullable=True),
+        sa.PrimaryKeyConstraint('date')
+    )
+
+
+def downgrade() -> None:
+    """Drop the day_payloads table."""
+    op.drop_table('day_payloads')
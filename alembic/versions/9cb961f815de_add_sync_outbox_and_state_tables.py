@@ -0,0 +1,41 @@
+"""Add sync outbox and state tables
+
+Revision ID: 9cb961f815de
+Revises: b7aec6d8c64f
+Create Date: 2026-10-19 11:11:00.001050
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9cb961f815de'
+down_revision: Union[str, Sequence[str], None] = 'b7aec6d8c64f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create the replication outbox and high-water mark tables."""
+    op.create_table('sync_outbox',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('table_name', sa.String(length=50), nullable=False),
+        sa.Column('row_id', sa.Integer(), nullable=False),
+        sa.Column('operation', sa.String(length=10), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sqlite_autoincrement=True
+    )
+    op.create_table('sync_state',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('last_outbox_id', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    """Drop the replication tables."""
+    op.drop_table('sync_state')
+    op.drop_table('sync_outbox')
@@ -0,0 +1,32 @@
+"""Add partial covering index for special events
+
+Revision ID: a258fc1d8407
+Revises: a9d19c8b813f
+Create Date: 2026-10-19 11:41:08.298701
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a258fc1d8407'
+down_revision: Union[str, Sequence[str], None] = 'a9d19c8b813f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Index (date, special_event) over the days that have a special event only."""
+    op.create_index(
+        'ix_days_special_events', 'days', ['date', 'special_event'],
+        postgresql_where=sa.text('special_event IS NOT NULL'),
+        sqlite_where=sa.text('special_event IS NOT NULL'),
+    )
+
+
+def downgrade() -> None:
+    """Drop the special events index."""
+    op.drop_index('ix_days_special_events', table_name='days')
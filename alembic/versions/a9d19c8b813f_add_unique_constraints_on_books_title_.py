@@ -0,0 +1,47 @@
+"""Add unique constraints on books title/author and months number
+
+Revision ID: a9d19c8b813f
+Revises: fb7ec1d3de3f
+Create Date: 2026-10-19 11:39:32.482319
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9d19c8b813f'
+down_revision: Union[str, Sequence[str], None] = 'fb7ec1d3de3f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Deduplicate months/books, then enforce one month per number and one book per title and author."""
+    # Rattacher les jours des mois en double au plus ancien mois du même numéro
+    op.execute("""
+        UPDATE days SET month_id = (
+            SELECT MIN(m2.id) FROM months m1 JOIN months m2 ON m2.number = m1.number WHERE m1.id = days.month_id
+        )
+        WHERE month_id IN (
+            SELECT m.id FROM months m WHERE m.id > (SELECT MIN(m3.id) FROM months m3 WHERE m3.number = m.number)
+        )
+    """)
+    op.execute("""
+        DELETE FROM months WHERE id > (SELECT MIN(m2.id) FROM months m2 WHERE m2.number = months.number)
+    """)
+    op.execute("""
+        DELETE FROM books WHERE id > (
+            SELECT MIN(b2.id) FROM books b2 WHERE b2.title = books.title AND b2.author = books.author
+        )
+    """)
+    op.create_index('uq_months_number', 'months', ['number'], unique=True)
+    op.create_index('uq_books_title_author', 'books', ['title', 'author'], unique=True)
+
+
+def downgrade() -> None:
+    """Drop the unique indexes (removed duplicates are not restored)."""
+    op.drop_index('uq_books_title_author', table_name='books')
+    op.drop_index('uq_months_number', table_name='months')
@@ -0,0 +1,49 @@
+"""Add unique constraints on days.date and readings day/period
+
+Revision ID: d5f4e8ea8e82
+Revises: 9cb961f815de
+Create Date: 2026-10-19 11:12:19.376902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5f4e8ea8e82'
+down_revision: Union[str, Sequence[str], None] = '9cb961f815de'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Deduplicate days/readings, then enforce one day per date and one reading per period."""
+    # Rattacher les lectures des jours en double au plus ancien jour de la même date
+    op.execute("""
+        UPDATE readings SET day_id = (
+            SELECT MIN(d2.id) FROM days d1 JOIN days d2 ON d2.date = d1.date WHERE d1.id = readings.day_id
+        )
+        WHERE day_id IN (
+            SELECT d.id FROM days d WHERE d.id > (SELECT MIN(d3.id) FROM days d3 WHERE d3.date = d.date)
+        )
+    """)
+    op.execute("""
+        DELETE FROM days WHERE id > (SELECT MIN(d2.id) FROM days d2 WHERE d2.date = days.date)
+    """)
+    # Garder la lecture la plus récente de chaque (jour, période)
+    op.execute("""
+        DELETE FROM readings WHERE id < (
+            SELECT MAX(r2.id) FROM readings r2
+            WHERE r2.day_id = readings.day_id AND r2.period = readings.period
+        )
+    """)
+    op.create_index(op.f('ix_days_date'), 'days', ['date'], unique=True)
+    op.create_index('uq_readings_day_period', 'readings', ['day_id', 'period'], unique=True)
+
+
+def downgrade() -> None:
+    """Drop the unique indexes (removed duplicates are not restored)."""
+    op.drop_index('uq_readings_day_period', table_name='readings')
+    op.drop_index(op.f('ix_days_date'), table_name='days')
@@ -0,0 +1,78 @@
+"""Add passages table for content-addressed readings
+
+Revision ID: f6e3d9658205
+Revises: 7a2a35229c5e
+Create Date: 2026-10-19 11:20:54.355950
+
+"""
+import hashlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6e3d9658205'
+down_revision: Union[str, Sequence[str], None] = '7a2a35229c5e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    """Move reading texts into content-addressed passages and drop redundant source_book values."""
+    op.create_table('passages',
+        sa.Column('hash', sa.String(length=64), nullable=False),
+        sa.Column('content', sa.Text(), nullable=False),
+        sa.PrimaryKeyConstraint('hash')
+    )
+    with op.batch_alter_table('readings') as batch_op:
+        batch_op.add_column(sa.Column('passage_hash', sa.String(length=64), nullable=True))
+        batch_op.create_index(batch_op.f('ix_readings_passage_hash'), ['passage_hash'], unique=False)
+        batch_op.create_foreign_key('fk_readings_passage_hash', 'passages', ['passage_hash'], ['hash'])
+
+    # Une ligne par texte distinct; chaque lecture ne garde que l'empreinte
+    bind = op.get_bind()
+    passages = sa.table('passages', sa.column('hash'), sa.column('content'))
+    readings = sa.table('readings', sa.column('id'), sa.column('content'), sa.column('passage_hash'))
+    seen = set()
+    rows = bind.execute(sa.select(readings.c.id, readings.c.content).where(readings.c.content.isnot(None))).all()
+    for start in range(0, len(rows), BATCH_SIZE):
+        batch = rows[start:start + BATCH_SIZE]
+        hashes = {row.id: hashlib.sha256(row.content.encode('utf-8')).hexdigest() for row in batch}
+        new_passages = {}
+        for row in batch:
+            digest = hashes[row.id]
+            if digest not in seen:
+                seen.add(digest)
+                new_passages[digest] = row.content
+        if new_passages:
+            bind.execute(passages.insert(), [{'hash': digest, 'content': content} for digest, content in new_passages.items()])
+        bind.execute(
+            readings.update().where(readings.c.id == sa.bindparam('reading_id')).values(passage_hash=sa.bindparam('digest')),
+            [{'reading_id': reading_id, 'digest': digest} for reading_id, digest in hashes.items()]
+        )
+
+    # source_book ne répète plus la référence (relu comme COALESCE(source_book, reference))
+    op.execute(sa.text("UPDATE readings SET source_book = NULL WHERE source_book = reference"))
+
+    with op.batch_alter_table('readings') as batch_op:
+        batch_op.drop_column('content')
+
+
+def downgrade() -> None:
+    """Copy passage texts and implicit source_book values back into readings."""
+    with op.batch_alter_table('readings') as batch_op:
+        batch_op.add_column(sa.Column('content', sa.Text(), nullable=True))
+    op.execute(sa.text(
+        "UPDATE readings SET content = (SELECT passages.content FROM passages WHERE passages.hash = readings.passage_hash)"
+    ))
+    op.execute(sa.text("UPDATE readings SET source_book = reference WHERE source_book IS NULL"))
+    with op.batch_alter_table('readings') as batch_op:
+        batch_op.drop_constraint('fk_readings_passage_hash', type_='foreignkey')
+        batch_op.drop_index(batch_op.f('ix_readings_passage_hash'))
+        batch_op.drop_column('passage_hash')
+    op.drop_table('passages')
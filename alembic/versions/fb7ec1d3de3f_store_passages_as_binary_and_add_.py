@@ -0,0 +1,57 @@
+"""Store passages as binary and add compression dictionaries
+
+Revision ID: fb7ec1d3de3f
+Revises: f6e3d9658205
+Create Date: 2026-10-19 11:23:02.296153
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from passage_storage import decode_passage
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'fb7ec1d3de3f'
+down_revision: Union[str, Sequence[str], None] = 'f6e3d9658205'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Store passage texts as bytes (UTF-8 or zstd frames) and add the dictionaries table."""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.alter_column('passages', 'content', type_=sa.LargeBinary(), postgresql_using="convert_to(content, 'UTF8')")
+    else:
+        with op.batch_alter_table('passages') as batch_op:
+            batch_op.alter_column('content', type_=sa.LargeBinary(), existing_nullable=False)
+
+    op.create_table('compression_dictionaries',
+        sa.Column('id', sa.BigInteger(), autoincrement=False, nullable=False),
+        sa.Column('data', sa.LargeBinary(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    """Decompress passages back to plain text and drop the dictionaries table."""
+    bind = op.get_bind()
+    passages = sa.table('passages', sa.column('hash'), sa.column('content', sa.LargeBinary()))
+    rows = bind.execute(sa.select(passages.c.hash, passages.c.content)).all()
+    if rows:
+        bind.execute(
+            passages.update().where(passages.c.hash == sa.bindparam('passage')).values(content=sa.bindparam('text')),
+            [{'passage': row.hash, 'text': decode_passage(row.content).encode('utf-8')} for row in rows]
+        )
+
+    if bind.dialect.name == 'postgresql':
+        op.alter_column('passages', 'content', type_=sa.Text(), postgresql_using="convert_from(content, 'UTF8')")
+    else:
+        with op.batch_alter_table('passages') as batch_op:
+            batch_op.alter_column('content', type_=sa.Text(), existing_nullable=False)
+        op.execute(sa.text("UPDATE passages SET content = CAST(content AS TEXT)"))
+
+    op.drop_table('compression_dictionaries')
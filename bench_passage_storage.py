@@ -0,0 +1,137 @@
+"""
+Mesure du stockage des passages (PASSAGE_STORAGE=text contre zstd + dictionnaire)
+pour 10 000 lectures: taille de la base, latence de lecture et mémoire.
+
+    python bench_passage_storage.py [nombre_de_lectures]
+
+Les textes sont synthétiques (phrases des fichiers reading_*.json recombinées), avec
+un passage distinct pour 2,5 lectures environ: les ratios réels dépendront du corpus.
+"""
+import glob
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.orm import Session, selectinload
+
+import models
+import passage_storage
+from database import Base
+from passage_storage import dictionaries
+from train_passage_dictionary import recompress_passages, train_dictionary
+
+READINGS = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+DISTINCT_RATIO = 0.4
+DAY_SAMPLES = 1000
+
+
+def corpus_sentences():
+    sentences = []
+    for path in sorted(glob.glob("reading_*.json")):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        for key in ("morning_verse", "evening_verse"):
+            sentences += [s for s in re.split(r"(?<=[.!?])\s+", data[key]) if s]
+    return sentences
+
+
+def synthetic_passages(count):
+    sentences = corpus_sentences()
+    rng = random.Random(42)
+    passages = []
+    for _ in range(count):
+        picked = rng.sample(sentences, rng.randint(3, 7))
+        words = " ".join(picked).split()
+        passages.append(" ".join(word for word in words if rng.random() > 0.1))
+    return passages
+
+
+def populate(db, passages):
+    month = models.Month(name="Bahá", translation="Splendeur", number=1)
+    db.add(month)
+    db.flush()
+    rng = random.Random(7)
+    start = date(2000, 1, 1)
+    for index in range(READINGS // 2):
+        day = models.Day(date=start + timedelta(days=index), month_id=month.id)
+        day.readings = [
+            models.Reading(period=period, content=rng.choice(passages), author="Baha'u'llah", reference="ref", source_book="ref")
+            for period in ("matin", "soir")
+        ]
+        db.add(day)
+    db.commit()
+
+
+def measure(mode, passages, directory):
+    passage_storage.PASSAGE_STORAGE = mode
+    path = os.path.join(directory, f"{mode}.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    dictionaries.load(engine)
+
+    with Session(engine) as db:
+        populate(db, passages)
+        if mode == "zstd":
+            train_dictionary(db)
+            recompress_passages(db)
+        stored = db.scalar(select(func.sum(func.length(text("CAST(passages.content AS BLOB)")))).select_from(models.Passage))
+        distinct = db.scalar(select(func.count()).select_from(models.Passage))
+    with engine.connect() as connection:
+        connection.exec_driver_sql("VACUUM")
+    size = os.path.getsize(path)
+
+    with Session(engine) as db:
+        started = time.perf_counter()
+        db.scalars(select(models.Reading.content).select_from(models.Reading)).all()
+        scan = time.perf_counter() - started
+
+    dates = [date(2000, 1, 1) + timedelta(days=i) for i in random.Random(3).sample(range(READINGS // 2), DAY_SAMPLES)]
+    latencies = []
+    with Session(engine) as db:
+        for day_date in dates:
+            started = time.perf_counter()
+            db.scalars(select(models.Day).options(selectinload(models.Day.readings)).where(models.Day.date == day_date)).first().readings
+            latencies.append((time.perf_counter() - started) * 1000)
+            db.expunge_all()
+
+    with Session(engine) as db:
+        tracemalloc.start()
+        readings = db.scalars(select(models.Reading)).all()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del readings
+
+    engine.dispose()
+    return {
+        "passages distincts": distinct,
+        "textes stockés (Ko)": round(stored / 1024, 1),
+        "taille de la base (Ko)": round(size / 1024, 1),
+        "lecture complète (ms)": round(scan * 1000, 1),
+        "jour p50 (ms)": round(statistics.median(latencies), 3),
+        "jour p95 (ms)": round(statistics.quantiles(latencies, n=20)[-1], 3),
+        "pic mémoire ORM (Ko)": round(peak / 1024, 1),
+    }
+
+
+def main():
+    if passage_storage.zstandard is None:
+        print("[ERROR] Le paquet zstandard est requis pour comparer les deux modes.")
+        return
+    passages = synthetic_passages(int(READINGS * DISTINCT_RATIO))
+    with tempfile.TemporaryDirectory() as directory:
+        results = {mode: measure(mode, passages, directory) for mode in ("text", "zstd")}
+    print(f"{READINGS} lectures")
+    for metric in results["text"]:
+        print(f"{metric:<24} text={results['text'][metric]:>10}  zstd={results['zstd'][metric]:>10}")
+
+
+if __name__ == "__main__":
+    main()
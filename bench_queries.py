@@ -0,0 +1,126 @@
+"""
+Mesure du temps CPU par exécution des requêtes de lecture fréquentes: requête ORM
+reconstruite à chaque appel (`db.query(...)`, forme d'origine des handlers) contre
+instruction préconstruite de queries.py avec paramètres liés.
+
+    python bench_queries.py [itérations]
+
+Base SQLite temporaire (une année de jours, deux lectures par jour); le temps SQL
+de SQLite est inclus dans les deux colonnes, seul l'écart compte.
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, load_only, selectinload
+
+import models
+import queries
+from database import Base
+from fieldsets import load_columns
+
+ITERATIONS = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+WARMUP = 200
+START = date(2025, 3, 21)
+
+
+def populate(db):
+    months = [models.Month(name=f"Mois {number}", translation="", number=number) for number in range(1, 20)]
+    db.add_all(months)
+    db.flush()
+    for index in range(365):
+        day = models.Day(date=START + timedelta(days=index), month_id=months[index % 19].id, special_event="Fête" if index % 19 == 0 else None)
+        day.readings = [
+            models.Reading(period=period, content=f"Passage {index} {period}", author="Baha'u'llah", reference="ref")
+            for period in ("matin", "soir")
+        ]
+        db.add(day)
+    db.commit()
+
+
+def cases(day_date, month_name):
+    """(nom, requête ORM reconstruite, instruction préconstruite) pour chaque requête chaude."""
+    end = day_date + timedelta(days=29)
+    return [
+        (
+            "jour par date",
+            lambda db: db.query(models.Day)
+            .options(load_only(models.Day.id), selectinload(models.Day.readings).options(load_columns(models.Reading, None)))
+            .filter(models.Day.date == day_date)
+            .first(),
+            lambda db: db.scalars(queries.day_by_date(None), {"day_date": day_date}).first(),
+        ),
+        (
+            "jour par date (fields)",
+            lambda db: db.query(models.Day)
+            .options(load_only(models.Day.id), selectinload(models.Day.readings).options(load_columns(models.Reading, ("period", "content"))))
+            .filter(models.Day.date == day_date)
+            .first(),
+            lambda db: db.scalars(queries.day_by_date(("period", "content")), {"day_date": day_date}).first(),
+        ),
+        (
+            "mois par nom",
+            lambda db: db.query(models.Month)
+            .options(
+                load_only(models.Month.id),
+                selectinload(models.Month.days).options(
+                    load_only(models.Day.id),
+                    selectinload(models.Day.readings).options(load_columns(models.Reading, None)),
+                ),
+            )
+            .filter(models.Month.name == month_name)
+            .first(),
+            lambda db: db.scalars(queries.month_by_name(None), {"month_name": month_name}).first(),
+        ),
+        (
+            "nom du mois par numéro",
+            lambda db: db.query(models.Month).options(load_only(models.Month.name)).filter(models.Month.number == 7).first(),
+            lambda db: db.scalar(queries.month_name_by_number, {"number": 7}),
+        ),
+        (
+            "30 jours (paquet hors ligne)",
+            lambda db: db.query(models.Day)
+            .options(load_only(models.Day.id, models.Day.date, models.Day.title, models.Day.special_event), selectinload(models.Day.readings))
+            .filter(models.Day.date >= day_date, models.Day.date <= end)
+            .all(),
+            lambda db: db.scalars(queries.days_between, {"start": day_date, "end": end}).all(),
+        ),
+        (
+            "événements",
+            lambda db: db.query(models.Day).filter(models.Day.special_event.isnot(None)).all(),
+            lambda db: db.execute(queries.special_events).all(),
+        ),
+    ]
+
+
+def cpu_per_call(db, run):
+    for _ in range(WARMUP):
+        run(db)
+        db.expunge_all()
+    started = time.process_time()
+    for _ in range(ITERATIONS):
+        run(db)
+        db.expunge_all()
+    return (time.process_time() - started) / ITERATIONS * 1_000_000
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        Base.metadata.create_all(engine)
+        with Session(engine) as db:
+            populate(db)
+        print(f"{ITERATIONS} exécutions par requête, temps CPU moyen (µs)")
+        print(f"{'requête':<30} {'ORM':>9} {'préconstruite':>14} {'gain':>7}")
+        with Session(engine) as db:
+            for name, orm, prebuilt in cases(START + timedelta(days=100), "Mois 7"):
+                before, after = cpu_per_call(db, orm), cpu_per_call(db, prebuilt)
+                print(f"{name:<30} {before:>9.1f} {after:>14.1f} {(1 - after / before) * 100:>6.0f}%")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Disjoncteur autour de l'accès à la base.
+
+Après `DB_BREAKER_THRESHOLD` erreurs de connexion ou de timeout consécutives, le
+disjoncteur s'ouvre pendant `DB_BREAKER_COOLDOWN` secondes: toute nouvelle connexion
+échoue immédiatement avec `DatabaseUnavailable` (503 + Retry-After) au lieu d'attendre
+le timeout du driver. Les routes de lecture servent alors la dernière réponse connue
+(voir cache.get_or_build); les écritures sont refusées dès la dépendance `db_slot`.
+À la fin du délai, une seule requête d'essai passe: son succès referme le disjoncteur,
+son échec le rouvre.
+"""
+import math
+import os
+import threading
+import time
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy import event
+
+from database import all_engines
+from metrics import metrics
+
+DB_BREAKER_THRESHOLD = int(os.getenv("DB_BREAKER_THRESHOLD", "5"))
+DB_BREAKER_COOLDOWN = float(os.getenv("DB_BREAKER_COOLDOWN", "30"))
+
+
+class DatabaseUnavailable(HTTPException):
+    """Base injoignable ou disjoncteur ouvert: 503 avec Retry-After."""
+
+    def __init__(self, retry_after: int, detail: str = "Base de données momentanément indisponible"):
+        super().__init__(status_code=503, detail=detail, headers={"Retry-After": str(retry_after)})
+
+
+class CircuitBreaker:
+    def __init__(self, threshold: int = DB_BREAKER_THRESHOLD, cooldown: float = DB_BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.state = "closed"
+        self._opened_at = 0.0
+        self._trial_started: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def is_open(self) -> bool:
+        """Vrai tant que le délai n'est pas écoulé (sans consommer l'essai du demi-ouvert)."""
+        return self.state == "open" and time.monotonic() - self._opened_at < self.cooldown
+
+    def retry_after(self) -> int:
+        return max(1, math.ceil(self.cooldown - (time.monotonic() - self._opened_at)))
+
+    def allow(self) -> bool:
+        """Autorise une connexion; à la fin du délai, laisse passer une seule requête d'essai."""
+        if self.state == "closed":
+            return True
+        with self._lock:
+            now = time.monotonic()
+            if self.state == "open" and now - self._opened_at >= self.cooldown:
+                self._set_state("half_open")
+                self._trial_started = None
+            if self.state == "half_open":
+                # Un essai resté sans verdict (erreur applicative) n'empêche pas le suivant
+                if self._trial_started is None or now - self._trial_started >= self.cooldown:
+                    self._trial_started = now
+                    return True
+            return self.state == "closed"
+
+    def record_success(self) -> None:
+        if self.state == "closed" and self.failures == 0:
+            return
+        with self._lock:
+            self.failures = 0
+            self._set_state("closed")
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.threshold:
+                self._opened_at = time.monotonic()
+                self._set_state("open")
+
+    def _set_state(self, state: str) -> None:
+        if state != self.state:
+            self.state = state
+            metrics.incr(f"breaker.{state}")
+        metrics.set_gauge("breaker.state", state)
+
+
+db_breaker = CircuitBreaker()
+
+
+def _check() -> None:
+    if not db_breaker.allow():
+        metrics.incr("breaker.rejected")
+        raise DatabaseUnavailable(db_breaker.retry_after())
+
+
+def _before_new_connection(dialect, conn_rec, cargs, cparams):
+    # Évite d'attendre le timeout de connexion quand la base est connue injoignable
+    # (sans consommer l'essai du demi-ouvert, vérifié ensuite par engine_connect)
+    if db_breaker.is_open():
+        metrics.incr("breaker.rejected")
+        raise DatabaseUnavailable(db_breaker.retry_after())
+
+
+def _before_checkout(connection):
+    _check()
+
+
+def _query_succeeded(conn, cursor, statement, parameters, context, executemany):
+    db_breaker.record_success()
+
+
+# SQLSTATE PostgreSQL comptés comme pannes, en plus de la classe 08 (connexion):
+# requête annulée (statement_timeout), serveur arrêté ou en démarrage, trop de connexions
+OUTAGE_SQLSTATES = ("57014", "57P01", "57P02", "57P03", "53300")
+
+
+def _is_outage(context) -> bool:
+    """Connexion perdue ou impossible, ou timeout; pas les autres OperationalError
+    (SQLite: table absente, base verrouillée par une autre écriture...)."""
+    if context.is_disconnect or context.connection is None:
+        return True
+    error = context.original_exception
+    sqlstate = getattr(error, "pgcode", None) or getattr(error, "sqlstate", None)
+    return sqlstate is not None and (sqlstate.startswith("08") or sqlstate in OUTAGE_SQLSTATES)
+
+
+def _query_failed(context):
+    # Seules les pannes comptent, pas les erreurs applicatives (contraintes, syntaxe, verrous)
+    if _is_outage(context):
+        db_breaker.record_failure()
+        raise DatabaseUnavailable(db_breaker.retry_after() if db_breaker.is_open() else 1) from context.original_exception
+
+
+# Un seul disjoncteur pour la base principale et ses réplicas
+for _engine in all_engines:
+    event.listen(_engine, "do_connect", _before_new_connection)
+    event.listen(_engine, "engine_connect", _before_checkout)
+    event.listen(_engine, "after_cursor_execute", _query_succeeded)
+    event.listen(_engine, "handle_error", _query_failed)
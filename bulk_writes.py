@@ -0,0 +1,202 @@
+"""
+Mises à jour et suppressions groupées (PATCH /readings, PATCH /days, DELETE filtrés).
+
+Chaque appel tient en quelques instructions ensemblistes dans une seule transaction:
+une lecture des lignes visées, un UPDATE par combinaison de colonnes modifiées
+(exécuté en lot sur les ids) ou un DELETE ... RETURNING par table. Ces instructions
+Core ne passent pas par les écouteurs de session: version, tombstones, outbox et
+payloads par date sont donc tenus ici, comme pour POST /readings/daily/, ainsi que la purge
+des passages que les lectures modifiées ou supprimées ne référencent plus.
+"""
+from collections import defaultdict
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import bindparam, delete, select, update
+from sqlalchemy.orm import Session
+
+import models
+from passages import purge_orphan_passages, store_passages, stored_source_book
+from read_model import day_dates, refresh_day_payloads
+from replication import record_changes
+from versioning import next_version, record_tombstones, stamp
+
+PERIODS = ("matin", "soir")
+
+_readings = models.Reading.__table__
+_days = models.Day.__table__
+
+
+def _check_unique_ids(ids: List[int]) -> None:
+    seen, duplicates = set(), set()
+    for row_id in ids:
+        (duplicates if row_id in seen else seen).add(row_id)
+    if duplicates:
+        duplicates = sorted(duplicates)
+        raise HTTPException(status_code=400, detail=f"Ids en double: {', '.join(map(str, duplicates))}")
+
+
+def _check_exist(db: Session, model, ids: Iterable[Optional[int]], label: str) -> None:
+    wanted = {row_id for row_id in ids if row_id is not None}
+    if not wanted:
+        return
+    found = set(db.scalars(select(model.id).where(model.id.in_(wanted))))
+    missing = sorted(wanted - found)
+    if missing:
+        raise HTTPException(status_code=404, detail=f"{label} non trouvé(s): {', '.join(map(str, missing))}")
+
+
+def _update_by_id(db: Session, table, rows: List[dict]) -> None:
+    """UPDATE ... WHERE id = :row_id, exécuté en lot pour chaque combinaison de colonnes."""
+    groups: Dict[Tuple[str, ...], List[dict]] = defaultdict(list)
+    for row in rows:
+        groups[tuple(sorted(row))].append(row)
+    for group in groups.values():
+        db.execute(update(table).where(table.c.id == bindparam("row_id")), group)
+
+
+def update_readings(db: Session, patches: List[dict]) -> Tuple[List[int], List[int]]:
+    """Applique des mises à jour partielles de lectures ({"id": ..., champ: valeur}).
+
+    Retourne (ids mis à jour, ids absents). `content` est converti en empreinte de
+    passage et `source_book` n'est stocké que s'il diffère de la référence.
+    """
+    ids = [patch["id"] for patch in patches]
+    _check_unique_ids(ids)
+    for patch in patches:
+        if "period" in patch and patch["period"] not in PERIODS:
+            raise HTTPException(status_code=400, detail="La période doit être 'matin' ou 'soir'")
+    _check_exist(db, models.Day, (patch.get("day_id") for patch in patches), "Jour(s)")
+
+    existing = {
+        row.id: row
+        for row in db.execute(
+            select(_readings.c.id, _readings.c.day_id, _readings.c.reference, _readings.c.source_book, _readings.c.passage_hash)
+            .where(_readings.c.id.in_(ids))
+        )
+    }
+    targets = [patch for patch in patches if patch["id"] in existing]
+    missing = sorted(set(ids) - set(existing))
+    if not targets:
+        return [], missing
+
+    hashes = store_passages(db, (patch["content"] for patch in targets if "content" in patch))
+    version_stamp = stamp(next_version(db))
+    rows = []
+    for patch in targets:
+        current = existing[patch["id"]]
+        row = {"row_id": patch["id"], **version_stamp}
+        for field in ("day_id", "period", "author", "page", "reference"):
+            if field in patch:
+                row[field] = patch[field]
+        if "content" in patch:
+            row["passage_hash"] = hashes.get(patch["content"])
+        if "source_book" in patch or "reference" in patch:
+            # Source effective avant la modification (NULL stocké = la référence)
+            source = patch["source_book"] if "source_book" in patch else current.source_book or current.reference
+            row["source_book"] = stored_source_book(source, patch.get("reference", current.reference))
+        rows.append(row)
+    _update_by_id(db, _readings, rows)
+    # Textes remplacés: supprimés s'ils ne servent plus à aucune lecture
+    purge_orphan_passages(db, (existing[patch["id"]].passage_hash for patch in targets if "content" in patch))
+
+    updated = [patch["id"] for patch in targets]
+    day_ids = {existing[row_id].day_id for row_id in updated} | {patch["day_id"] for patch in targets if "day_id" in patch}
+    refresh_day_payloads(db, day_dates(db, day_ids))
+    record_changes(db, "readings", updated)
+    return updated, missing
+
+
+def update_days(db: Session, patches: List[dict]) -> Tuple[List[int], List[int]]:
+    """Applique des mises à jour partielles de jours; retourne (ids mis à jour, ids absents)."""
+    ids = [patch["id"] for patch in patches]
+    _check_unique_ids(ids)
+    _check_exist(db, models.Month, (patch.get("month_id") for patch in patches), "Mois")
+
+    existing = dict(db.execute(select(_days.c.id, _days.c.date).where(_days.c.id.in_(ids))).all())
+    targets = [patch for patch in patches if patch["id"] in existing]
+    missing = sorted(set(ids) - set(existing))
+    if not targets:
+        return [], missing
+
+    version_stamp = stamp(next_version(db))
+    rows = [
+        {"row_id": patch["id"], **{field: value for field, value in patch.items() if field != "id"}, **version_stamp}
+        for patch in targets
+    ]
+    _update_by_id(db, _days, rows)
+
+    updated = [patch["id"] for patch in targets]
+    dates = {existing[row_id] for row_id in updated} | {patch.get("date") for patch in targets}
+    refresh_day_payloads(db, dates)
+    record_changes(db, "days", updated)
+    return updated, missing
+
+
+def _record_deletes(db: Session, deleted: Dict[str, List[int]], dates: Set[date]) -> None:
+    if not any(deleted.values()):
+        return
+    version = next_version(db)
+    for table_name, row_ids in deleted.items():
+        record_tombstones(db, table_name, row_ids, version)
+        record_changes(db, table_name, row_ids, operation="delete")
+    refresh_day_payloads(db, dates)
+
+
+def _day_filters(month_id: Optional[int], date_from: Optional[date], date_to: Optional[date]) -> list:
+    filters = []
+    if month_id is not None:
+        filters.append(models.Day.month_id == month_id)
+    if date_from is not None:
+        filters.append(models.Day.date >= date_from)
+    if date_to is not None:
+        filters.append(models.Day.date <= date_to)
+    return filters
+
+
+def delete_readings(
+    db: Session,
+    day_id: Optional[int] = None,
+    month_id: Optional[int] = None,
+    period: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+) -> Dict[str, int]:
+    """Supprime en un DELETE ... RETURNING les lectures qui correspondent à tous les filtres."""
+    filters = _day_filters(month_id, date_from, date_to)
+    if day_id is not None:
+        filters.append(models.Reading.day_id == day_id)
+    if period is not None:
+        filters.append(models.Reading.period == period)
+    if not filters:
+        raise HTTPException(status_code=400, detail="Au moins un filtre est requis pour une suppression groupée")
+
+    matching = select(models.Reading.id).join(models.Day, models.Day.id == models.Reading.day_id).where(*filters)
+    rows = db.execute(
+        delete(_readings).where(_readings.c.id.in_(matching)).returning(_readings.c.id, _readings.c.day_id, _readings.c.passage_hash)
+    ).all()
+    purge_orphan_passages(db, (row.passage_hash for row in rows))
+    deleted = {"readings": [row.id for row in rows]}
+    _record_deletes(db, deleted, set(day_dates(db, {row.day_id for row in rows})))
+    return {table_name: len(row_ids) for table_name, row_ids in deleted.items()}
+
+
+def delete_days(
+    db: Session,
+    month_id: Optional[int] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+) -> Dict[str, int]:
+    """Supprime les jours qui correspondent à tous les filtres, avec leurs lectures."""
+    filters = _day_filters(month_id, date_from, date_to)
+    if not filters:
+        raise HTTPException(status_code=400, detail="Au moins un filtre est requis pour une suppression groupée")
+
+    matching = select(models.Day.id).where(*filters)
+    readings = db.execute(delete(_readings).where(_readings.c.day_id.in_(matching)).returning(_readings.c.id, _readings.c.passage_hash)).all()
+    purge_orphan_passages(db, (row.passage_hash for row in readings))
+    days = db.execute(delete(_days).where(_days.c.id.in_(matching)).returning(_days.c.id, _days.c.date)).all()
+    deleted = {"days": [row.id for row in days], "readings": [row.id for row in readings]}
+    _record_deletes(db, deleted, {row.date for row in days})
+    return {table_name: len(row_ids) for table_name, row_ids in deleted.items()}
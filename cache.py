@@ -0,0 +1,180 @@
+"""
+Cache mémoire des réponses sérialisées (corps JSON + variantes compressées).
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from typing import Callable, Dict, Hashable, Optional
+
+from fastapi import Request, Response
+
+from access_log import note_cache
+from breaker import DatabaseUnavailable
+from compression import SUPPORTED_ENCODINGS, compress_all, negotiate_encoding
+from metrics import metrics
+from singleflight import SingleFlight
+
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "300"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+
+
+@dataclass
+class CachedPayload:
+    """Corps JSON déjà sérialisé et ses variantes compressées, calculées une fois."""
+    body: bytes
+    encoded: Dict[str, bytes] = field(default_factory=dict)
+    etag: Optional[str] = None
+    created_at: float = field(default_factory=time.monotonic)
+    stale: bool = False  # dernière version connue, servie pendant une panne de la base
+
+    @classmethod
+    def build(cls, body: bytes, compress: bool = True) -> "CachedPayload":
+        etag = '"%s"' % hashlib.blake2b(body, digest_size=16).hexdigest()
+        return cls(body=body, encoded=compress_all(body) if compress else {}, etag=etag)
+
+
+class PayloadCache:
+    """Cache LRU thread-safe avec expiration (TTL) optionnelle.
+
+    Une entrée expirée n'est plus retournée par `get` mais reste disponible pour
+    `get_stale` jusqu'à son éviction (LRU) ou un `clear`.
+    """
+
+    def __init__(self, ttl: Optional[float] = CACHE_TTL_SECONDS, maxsize: int = CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, CachedPayload]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[CachedPayload]:
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is None:
+                return None
+            if self.ttl is not None and time.monotonic() - payload.created_at > self.ttl:
+                return None
+            self._entries.move_to_end(key)
+            return payload
+
+    def get_stale(self, key: Hashable) -> Optional[CachedPayload]:
+        """Dernière valeur connue, même expirée."""
+        with self._lock:
+            return self._entries.get(key)
+
+    def set(self, key: Hashable, payload: CachedPayload) -> None:
+        with self._lock:
+            self._entries[key] = payload
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key) is not None
+
+
+# Cache partagé des lectures (aujourd'hui, par date, par mois)
+payload_cache = PayloadCache()
+
+# Calendriers annuels: calculés une fois par année, sans expiration, bornés en nombre
+year_calendar_cache = PayloadCache(ttl=None, maxsize=int(os.getenv("YEAR_CALENDAR_CACHE_SIZE", "16")))
+
+# Paquets hors ligne des prochains jours: un par (date du jour, nombre de jours)
+upcoming_cache = PayloadCache(ttl=None, maxsize=16)
+
+# Conversions de dates (/bahai/date, /bahai/convert): à part, pour ne pas évincer les lectures
+bahai_date_cache = PayloadCache(maxsize=int(os.getenv("BAHAI_DATE_CACHE_SIZE", "512")))
+
+
+def invalidate_payloads() -> None:
+    """Vide les caches de réponses après une écriture sur les mois, jours ou lectures."""
+    payload_cache.clear()
+    year_calendar_cache.clear()
+    upcoming_cache.clear()
+    bahai_date_cache.clear()
+
+# Calculs en cours, pour que des cache miss simultanés ne frappent la base qu'une fois
+single_flight = SingleFlight()
+
+
+def _build_and_store(cache: PayloadCache, key: Hashable, build: Callable[[], CachedPayload]) -> CachedPayload:
+    # Un autre leader a pu remplir l'entrée entre notre cache miss et notre tour
+    payload = cache.get(key)
+    if payload is None:
+        payload = build()
+        cache.set(key, payload)
+    return payload
+
+
+def _stale_or_raise(cache: PayloadCache, key: Hashable, error: DatabaseUnavailable) -> CachedPayload:
+    payload = cache.get_stale(key)
+    if payload is None:
+        raise error
+    metrics.incr("cache.stale_served")
+    return replace(payload, stale=True)
+
+
+def get_or_build(key: Hashable, build: Callable[[], CachedPayload], cache: PayloadCache = payload_cache) -> CachedPayload:
+    """Lit le cache; en cas d'absence, un seul appel concurrent exécute `build`.
+
+    Si la base est indisponible, sert la dernière version connue (marquée périmée).
+    """
+    payload = cache.get(key)
+    note_cache(payload is not None)
+    if payload is None:
+        try:
+            payload = single_flight.do((id(cache), key), lambda: _build_and_store(cache, key, build))
+        except DatabaseUnavailable as error:
+            payload = _stale_or_raise(cache, key, error)
+    return payload
+
+
+async def get_or_build_async(key: Hashable, build: Callable[[], CachedPayload], cache: PayloadCache = payload_cache) -> CachedPayload:
+    """Variante asynchrone de `get_or_build`; `build` (synchrone) tourne dans le threadpool."""
+    payload = cache.get(key)
+    note_cache(payload is not None)
+    if payload is None:
+        try:
+            payload = await single_flight.do_async((id(cache), key), lambda: _build_and_store(cache, key, build))
+        except DatabaseUnavailable as error:
+            payload = _stale_or_raise(cache, key, error)
+    return payload
+
+
+def payload_response(
+    request: Request,
+    payload: CachedPayload,
+    status_code: int = 200,
+    cache_control: Optional[str] = None,
+) -> Response:
+    """Construit la réponse HTTP en servant la variante compressée acceptée par le client.
+
+    Répond 304 sans corps si le client possède déjà cette version (If-None-Match).
+    """
+    headers = {"Vary": "Accept-Encoding"}
+    if payload.etag:
+        headers["ETag"] = payload.etag
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+    if payload.stale:
+        headers["X-Cache"] = "stale"
+        headers["Cache-Control"] = "no-cache"
+    if payload.etag and payload.etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    body = payload.body
+    # Négociation parmi les variantes précalculées seulement: un client "gzip, br" reçoit
+    # la variante gzip d'un payload qui n'a pas de variante br, plutôt que le corps brut
+    encoding = negotiate_encoding(
+        request.headers.get("accept-encoding"),
+        [encoding for encoding in SUPPORTED_ENCODINGS if encoding in payload.encoded],
+    )
+    if encoding is not None:
+        body = payload.encoded[encoding]
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, status_code=status_code, media_type="application/json", headers=headers)
@@ -0,0 +1,76 @@
+"""
+Compression des réponses avec négociation Accept-Encoding (Brotli / gzip).
+"""
+import gzip
+import os
+from typing import Dict, Iterable, Optional
+
+try:
+    import brotli  # pyright: ignore[reportMissingImports]
+except ImportError:  # Brotli est optionnel: on se rabat sur gzip
+    brotli = None
+
+# En dessous de cette taille, la compression coûte plus qu'elle ne rapporte
+MINIMUM_SIZE = 500
+
+# Au-delà de cette taille, la compression à la volée passe dans le threadpool pour ne
+# pas bloquer la boucle d'événements (/readings/batch, /sync)
+THREADPOOL_MIN_SIZE = int(os.getenv("COMPRESS_THREADPOOL_MIN_SIZE", "65536"))
+
+# Ordre de préférence du serveur à qualité égale
+SUPPORTED_ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate_encoding(accept_encoding: Optional[str], available: Iterable[str] = SUPPORTED_ENCODINGS) -> Optional[str]:
+    """Choisit le meilleur encodage parmi `available` à partir de l'en-tête Accept-Encoding.
+
+    Respecte les poids q= (q=0 exclut un encodage) et le joker "*".
+    Retourne None si aucune compression n'est acceptable.
+    """
+    if not accept_encoding:
+        return None
+
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[token] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in available:
+        quality = weights.get(encoding, weights.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(body: bytes, encoding: str, fast: bool = False) -> bytes:
+    """Compresse le corps avec l'encodage demandé.
+
+    `fast=True` privilégie la vitesse pour les réponses calculées à chaque requête.
+    """
+    if encoding == "br":
+        return brotli.compress(body, quality=5 if fast else 11)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=6 if fast else 9, mtime=0)
+    raise ValueError(f"Encodage non supporté: {encoding}")
+
+
+def compress_all(body: bytes) -> Dict[str, bytes]:
+    """Précalcule toutes les variantes compressées d'un corps (vide si trop petit).
+
+    Utilisé pour les réponses mises en cache: on paie le niveau de compression
+    maximal une seule fois au lieu de recompresser à chaque requête.
+    """
+    if len(body) < MINIMUM_SIZE:
+        return {}
+    return {encoding: compress(body, encoding) for encoding in SUPPORTED_ENCODINGS}
@@ -0,0 +1,161 @@
+"""
+Capacité du threadpool et limites de concurrence par groupe de routes.
+
+Les handlers synchrones partagent le limiteur de threads d'AnyIO; sans autre borne,
+plus de requêtes que de connexions du pool SQLAlchemy peuvent démarrer et attendre
+un checkout jusqu'au timeout. Chaque groupe (lectures, écritures, appels Supabase)
+a donc son propre sémaphore, dimensionné sur le pool: les requêtes en trop attendent
+dans la boucle d'événements, sans occuper de thread, et le temps d'attente est mesuré
+(`concurrency.<groupe>.wait` sur /metrics). Quand la file d'un groupe est trop longue,
+les nouvelles requêtes sont délestées (503) avant d'avoir attendu.
+
+Une lecture ne prend sa place qu'à sa première requête SQL (`ReadSlot`): les réponses
+servies depuis le cache ne font jamais la queue et ne sont jamais délestées.
+"""
+import os
+import time
+
+import anyio
+from fastapi import HTTPException, Request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from breaker import DatabaseUnavailable, db_breaker
+from database import POOL_CAPACITY
+from metrics import metrics
+from supabase_client import SUPABASE_MAX_CONNECTIONS
+
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", "40"))
+
+# Par défaut: écritures = 1/4 du pool, lectures = le reste moins une connexion
+# laissée aux tâches de fond (réplication, pré-calcul)
+WRITE_CONCURRENCY = int(os.getenv("WRITE_CONCURRENCY", str(max(1, POOL_CAPACITY // 4))))
+READ_CONCURRENCY = int(os.getenv("READ_CONCURRENCY", str(max(1, POOL_CAPACITY - WRITE_CONCURRENCY - 1))))
+SUPABASE_CONCURRENCY = int(os.getenv("SUPABASE_CONCURRENCY", str(SUPABASE_MAX_CONNECTIONS)))
+
+# Délestage: au-delà de ce nombre de requêtes en attente, le groupe répond 503 tout de suite.
+# Seules les requêtes qui attendent une connexion sont comptées (écritures, lectures hors cache):
+# 4 × la concurrence du groupe, soit au plus 4 requêtes en attente par connexion du pool qui
+# lui est réservée. Avec le pool par défaut (POOL_CAPACITY = 5 + 10): 11 lectures en cours
+# et 44 en attente, 3 écritures en cours et 12 en attente.
+READ_QUEUE_LIMIT = int(os.getenv("READ_QUEUE_LIMIT", str(READ_CONCURRENCY * 4)))
+WRITE_QUEUE_LIMIT = int(os.getenv("WRITE_QUEUE_LIMIT", str(WRITE_CONCURRENCY * 4)))
+SUPABASE_QUEUE_LIMIT = int(os.getenv("SUPABASE_QUEUE_LIMIT", str(SUPABASE_CONCURRENCY * 4)))
+
+READ_METHODS = ("GET", "HEAD", "OPTIONS")
+# Routes POST qui ne font que lire (corps de requête trop grand pour une query string)
+READ_ONLY_PATHS = ("/readings/batch",)
+
+
+def is_read_request(request: Request) -> bool:
+    route = request.scope.get("route")
+    return request.method in READ_METHODS or (route is not None and route.path in READ_ONLY_PATHS)
+
+
+class ConcurrencyLimit:
+    """Sémaphore asynchrone d'un groupe de routes, avec mesure de l'attente."""
+
+    def __init__(self, name: str, limit: int, max_waiting: int):
+        self.name = name
+        self.limit = limit
+        self.max_waiting = max_waiting
+        self.waiting = 0
+        self._semaphore = None
+
+    @property
+    def in_flight(self) -> int:
+        return self.limit - self._semaphore.value if self._semaphore is not None else 0
+
+    async def __aenter__(self):
+        # Créé à la première utilisation, dans la boucle d'événements de l'application
+        if self._semaphore is None:
+            self._semaphore = anyio.Semaphore(self.limit)
+        if self._semaphore.value == 0 and self.waiting >= self.max_waiting:
+            # Surcharge: refuser maintenant plutôt qu'après un long temps d'attente
+            metrics.incr(f"concurrency.{self.name}.shed")
+            raise HTTPException(status_code=503, detail="Serveur surchargé, réessayez plus tard", headers={"Retry-After": "1"})
+        started = time.perf_counter()
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        metrics.observe(f"concurrency.{self.name}.wait", time.perf_counter() - started)
+        metrics.set_gauge(f"concurrency.{self.name}.in_flight", self.in_flight)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self._semaphore.release()
+        metrics.set_gauge(f"concurrency.{self.name}.in_flight", self.in_flight)
+
+
+limits = {
+    "read": ConcurrencyLimit("read", READ_CONCURRENCY, READ_QUEUE_LIMIT),
+    "write": ConcurrencyLimit("write", WRITE_CONCURRENCY, WRITE_QUEUE_LIMIT),
+    "supabase": ConcurrencyLimit("supabase", SUPABASE_CONCURRENCY, SUPABASE_QUEUE_LIMIT),
+}
+
+
+def configure_threadpool() -> None:
+    """Applique THREADPOOL_SIZE au limiteur de threads par défaut d'AnyIO (à appeler au démarrage)."""
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+
+
+class ReadSlot:
+    """Place du groupe lectures, prise à la première requête SQL de la session liée.
+
+    L'acquisition se fait depuis le thread du pool qui exécute la requête SQL; l'attente
+    elle-même a lieu dans la boucle d'événements.
+    """
+
+    def __init__(self, limit: ConcurrencyLimit):
+        self.limit = limit
+        self.held = False
+
+    def bind(self, session: Session) -> Session:
+        session.info["read_slot"] = self
+        return session
+
+    def acquire(self) -> None:
+        if not self.held:
+            anyio.from_thread.run(self.limit.__aenter__)
+            self.held = True
+
+    async def release(self) -> None:
+        if self.held:
+            self.held = False
+            await self.limit.__aexit__(None, None, None)
+
+
+@event.listens_for(Session, "after_transaction_create")
+def _take_read_slot(session: Session, transaction) -> None:
+    # Transaction racine créée au premier accès à la base, avant le checkout de la connexion
+    slot = session.info.get("read_slot")
+    if slot is not None and transaction.parent is None:
+        slot.acquire()
+
+
+async def db_slot(request: Request):
+    """Dépendance: une place du groupe écritures, tenue pendant la requête, ou pour une
+    lecture un `ReadSlot` pris seulement si la requête touche la base.
+
+    Disjoncteur ouvert: les écritures échouent tout de suite (503 + Retry-After); les
+    lectures continuent, pour servir le cache ou sa dernière version connue.
+    """
+    if not is_read_request(request):
+        if db_breaker.is_open():
+            raise DatabaseUnavailable(db_breaker.retry_after())
+        async with limits["write"]:
+            yield None
+        return
+    slot = ReadSlot(limits["read"])
+    try:
+        yield slot
+    finally:
+        await slot.release()
+
+
+async def supabase_slot():
+    """Dépendance: une place du groupe des appels Supabase."""
+    async with limits["supabase"]:
+        yield
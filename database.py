@@ -1,7 +1,10 @@
-from sqlalchemy import create_engine  # pyright: ignore[reportMissingImports]
+from sqlalchemy import create_engine, event  # pyright: ignore[reportMissingImports]
 from sqlalchemy.ext.declarative import declarative_base  # pyright: ignore[reportMissingImports]
 from sqlalchemy.orm import sessionmaker  # pyright: ignore[reportMissingImports]
+from sqlalchemy.dialects import postgresql, sqlite  # pyright: ignore[reportMissingImports]
+import itertools
 import os
+import time
 from dotenv import load_dotenv  # pyright: ignore[reportMissingImports]
 
 # Charger les variables d'environnement depuis un fichier .env si présent (si présent)
@@ -39,9 +42,93 @@ def get_database_url() -> str:
 
 SQLALCHEMY_DATABASE_URL = get_database_url()
 
-connect_args = {"check_same_thread": False} if SQLALCHEMY_DATABASE_URL.startswith("sqlite") else {}
+# Timeouts courts côté PostgreSQL: une base lente échoue vite (et ouvre le disjoncteur, voir breaker.py)
+# au lieu de bloquer les requêtes. 0 désactive le timeout de requête.
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "5000"))
+DB_CONNECT_TIMEOUT = int(os.getenv("DB_CONNECT_TIMEOUT", "5"))
+
+# Taille du pool de connexions (défauts SQLAlchemy); la concurrence des routes est dimensionnée dessus
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+POOL_CAPACITY = DB_POOL_SIZE + DB_MAX_OVERFLOW
+
+# Réplicas en lecture (URLs séparées par des virgules); vide = tout sur la base principale
+DATABASE_READ_URLS = [
+    _normalize_postgres_driver(url.strip())
+    for url in os.getenv("DATABASE_READ_URLS", "").split(",")
+    if url.strip()
+]
+# Après une écriture, les lectures restent sur la base principale pendant ce délai
+# (retard de réplication): pour le client qui a écrit (cookie) et pour ce processus
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "10"))
+
+
+def _create_engine(url: str):
+    if url.startswith("sqlite"):
+        connect_args = {"check_same_thread": False}
+    else:
+        connect_args = {"connect_timeout": DB_CONNECT_TIMEOUT}
+        if DB_STATEMENT_TIMEOUT_MS > 0:
+            connect_args["options"] = f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"
+    pool_options = {} if ":memory:" in url else {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+    }
+    return create_engine(url, connect_args=connect_args, **pool_options)
+
+
+engine = _create_engine(SQLALCHEMY_DATABASE_URL)
+read_engines = [_create_engine(url) for url in DATABASE_READ_URLS]
+all_engines = [engine, *read_engines]
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args=connect_args)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False)
+
+_read_engine_index = itertools.count()
+_last_write_at = 0.0
+
+
+class ReadOnlySessionError(RuntimeError):
+    pass
+
+
+@event.listens_for(ReadSessionLocal, "before_flush")
+def _reject_writes(session, flush_context, instances):
+    if session.new or session.dirty or session.deleted:
+        raise ReadOnlySessionError("Écriture refusée sur une session de lecture (réplica)")
 
-Base = declarative_base()
\ No newline at end of file
+
+def read_session():
+    """Session en lecture seule sur un réplica (tourniquet), ou sur la base principale sans réplica."""
+    if not read_engines:
+        return ReadSessionLocal(bind=engine)
+    return ReadSessionLocal(bind=read_engines[next(_read_engine_index) % len(read_engines)])
+
+
+def note_write() -> None:
+    """Signale une écriture réussie: les lectures de ce processus restent sur la base principale un moment."""
+    global _last_write_at
+    _last_write_at = time.monotonic()
+
+
+def wrote_recently() -> bool:
+    return time.monotonic() - _last_write_at < READ_YOUR_WRITES_SECONDS
+
+
+Base = declarative_base()
+
+
+def dialect_insert(session):
+    """Retourne la construction `insert` du dialecte courant (supporte ON CONFLICT ... RETURNING).
+
+    SQLite (>= 3.35) et PostgreSQL exposent tous deux `on_conflict_do_update` /
+    `on_conflict_do_nothing`; la construction générique de SQLAlchemy ne le fait pas.
+    """
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert
+    if dialect == "sqlite":
+        return sqlite.insert
+    raise NotImplementedError(f"INSERT ... ON CONFLICT non supporté pour le dialecte {dialect}")
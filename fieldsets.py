@@ -0,0 +1,87 @@
+"""
+Projections légères (`fields=` / `include=`) pour ne charger et sérialiser que les colonnes demandées.
+"""
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi import HTTPException, Response
+from sqlalchemy.orm import load_only
+
+import models
+import schemas
+
+# Colonnes exposées par modèle (celles des schémas de réponse)
+FIELDSETS = {
+    models.Reading: ("id", "day_id", "period", "content", "author", "source_book", "page", "reference"),
+    models.Day: ("id", "date", "month_id", "special_event"),
+    models.Month: ("id", "name", "translation", "number"),
+    models.Book: ("id", "title", "author", "url"),
+}
+
+# Relations imbriquées qu'il est possible d'inclure explicitement
+INCLUDES = {
+    models.Month: ("days",),
+    models.Day: ("readings",),
+}
+
+
+def _split(value: Optional[str]) -> Tuple[str, ...]:
+    if not value:
+        return ()
+    return tuple(dict.fromkeys(part.strip() for part in value.split(",") if part.strip()))
+
+
+def parse_fields(model, fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """Valide le paramètre `fields` (liste séparée par des virgules). None = toutes les colonnes."""
+    requested = _split(fields)
+    if not requested:
+        return None
+    unknown = [name for name in requested if name not in FIELDSETS[model]]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Champs inconnus: {', '.join(unknown)}. Champs disponibles: {', '.join(FIELDSETS[model])}"
+        )
+    return requested
+
+
+def parse_include(model, include: Optional[str]) -> Tuple[str, ...]:
+    """Valide le paramètre `include` (relations imbriquées à sérialiser)."""
+    requested = _split(include)
+    allowed = INCLUDES.get(model, ())
+    unknown = [name for name in requested if name not in allowed]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Relations inconnues: {', '.join(unknown)}. Relations disponibles: {', '.join(allowed) or 'aucune'}"
+        )
+    return requested
+
+
+def columns(model, fields: Optional[Tuple[str, ...]]):
+    """Attributs de colonnes à passer à `load_only` / `refresh(attribute_names=...)`."""
+    return [getattr(model, name) for name in (fields or FIELDSETS[model])]
+
+
+def load_columns(model, fields: Optional[Tuple[str, ...]]):
+    """Option `load_only` limitant le SELECT aux colonnes demandées."""
+    return load_only(*columns(model, fields))
+
+
+def project(obj, fields: Optional[Tuple[str, ...]] = None, include: Tuple[str, ...] = ()) -> Dict[str, Any]:
+    """Sérialise uniquement les colonnes demandées (et les relations incluses) d'un objet ORM."""
+    model = type(obj)
+    data = {name: getattr(obj, name) for name in (fields or FIELDSETS[model])}
+    for relation in include:
+        data[relation] = [project(child) for child in getattr(obj, relation)]
+    return data
+
+
+def refresh_projection(db, obj, fields: Optional[Tuple[str, ...]]) -> None:
+    """Recharge après commit uniquement les colonnes qui seront sérialisées."""
+    db.refresh(obj, attribute_names=list(fields or FIELDSETS[type(obj)]))
+
+
+def projected_response(data: Any, code: int = 200, message: str = "Success", status_code: int = 200) -> Response:
+    """Enveloppe APIResponse sérialisée directement, sans revalidation par le response_model."""
+    body = schemas.APIResponse[Any](code=code, message=message, data=data).model_dump_json()
+    return Response(content=body, status_code=status_code, media_type="application/json")
@@ -0,0 +1,90 @@
+"""
+Sondes de vie et de disponibilité (/healthz, /readyz) et suivi du préchauffage au démarrage.
+"""
+import logging
+import os
+import time
+from functools import lru_cache
+from typing import Callable, List, Optional
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class Warmup:
+    """État du préchauffage lancé au démarrage: /readyz reste à 503 tant qu'il n'est pas fini."""
+
+    def __init__(self):
+        self.done = False
+        self.error: Optional[str] = None
+        self.duration: Optional[float] = None
+
+    def run(self, warm: Callable[[], None]) -> None:
+        started = time.perf_counter()
+        try:
+            warm()
+        except Exception as e:
+            # Un préchauffage raté ne doit pas bloquer le worker: les caches se rempliront à la demande
+            logger.exception("Préchauffage en échec")
+            self.error = str(e)
+        finally:
+            self.duration = time.perf_counter() - started
+            self.done = True
+
+    def status(self) -> dict:
+        return {"done": self.done, "error": self.error, "duration_ms": round(self.duration * 1000, 1) if self.duration is not None else None}
+
+
+warmup = Warmup()
+
+
+@lru_cache(maxsize=1)
+def migration_heads() -> List[str]:
+    """Révisions alembic de tête des scripts déployés (lues une fois)."""
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    config = Config(os.path.join(APP_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(APP_DIR, "alembic"))
+    return list(ScriptDirectory.from_config(config).get_heads())
+
+
+def database_status(engine: Engine) -> dict:
+    """Connexion au pool (SELECT 1), occupation du pool et révision alembic de la base.
+
+    `migrations.up_to_date` vaut None si la base n'est pas gérée par alembic
+    (création par `create_all` en développement).
+    """
+    pool = engine.pool
+    status = {
+        "pool": {
+            "size": pool.size() if hasattr(pool, "size") else None,
+            "checked_out": pool.checkedout() if hasattr(pool, "checkedout") else None,
+            "overflow": pool.overflow() if hasattr(pool, "overflow") else None,
+        },
+    }
+    started = time.perf_counter()
+    try:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+            current = None
+            if inspect(connection).has_table("alembic_version"):
+                current = connection.execute(text("SELECT version_num FROM alembic_version")).scalars().all()
+    except Exception as e:
+        status["ok"] = False
+        status["error"] = str(e)
+        return status
+    status["ok"] = True
+    status["latency_ms"] = round((time.perf_counter() - started) * 1000, 2)
+
+    heads = migration_heads()
+    status["migrations"] = {
+        "current": current,
+        "head": heads,
+        "up_to_date": sorted(current) == sorted(heads) if current is not None else None,
+    }
+    return status
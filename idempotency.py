@@ -0,0 +1,59 @@
+"""
+Rejeu des réponses d'écriture via l'en-tête `Idempotency-Key`.
+"""
+import hashlib
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+from fastapi import HTTPException, Response
+
+from cache import PayloadCache
+
+IDEMPOTENCY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+IDEMPOTENCY_MAX_KEYS = int(os.getenv("IDEMPOTENCY_MAX_KEYS", "10000"))
+
+
+@dataclass
+class StoredResponse:
+    """Réponse déjà envoyée pour une clé, avec l'empreinte de la requête d'origine."""
+    fingerprint: str
+    body: bytes
+    status_code: int
+    created_at: float = field(default_factory=time.monotonic)
+
+
+idempotency_store = PayloadCache(ttl=IDEMPOTENCY_TTL_SECONDS, maxsize=IDEMPOTENCY_MAX_KEYS)
+
+
+def request_fingerprint(*parts: str) -> str:
+    """Empreinte du corps et des paramètres de la requête."""
+    return hashlib.sha256("\x1f".join(parts).encode()).hexdigest()
+
+
+def replay(key: Optional[str], scope: str, fingerprint: str) -> Optional[Response]:
+    """Retourne la réponse mémorisée pour cette clé, sans toucher à la base.
+
+    Une même clé réutilisée avec une requête différente est refusée (422).
+    """
+    if not key:
+        return None
+    stored = idempotency_store.get((scope, key))
+    if stored is None:
+        return None
+    if stored.fingerprint != fingerprint:
+        raise HTTPException(status_code=422, detail="Idempotency-Key déjà utilisée pour une requête différente")
+    return Response(
+        content=stored.body,
+        status_code=stored.status_code,
+        media_type="application/json",
+        headers={"Idempotent-Replayed": "true"},
+    )
+
+
+def remember(key: Optional[str], scope: str, fingerprint: str, response: Response) -> Response:
+    """Mémorise la réponse envoyée pour cette clé et la retourne telle quelle."""
+    if key:
+        idempotency_store.set((scope, key), StoredResponse(fingerprint, response.body, response.status_code))
+    return response
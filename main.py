@@ -1,33 +1,79 @@
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from sqlalchemy import BigInteger, Date, DateTime, String, and_, exists, func, literal, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload, load_only
+from sqlalchemy.orm.attributes import set_committed_value
+from typing import Any, Iterator, List, Optional, Tuple
+import bulk_writes
 import models
+import queries
 import schemas
-from database import SessionLocal, engine
-from datetime import date, datetime
-from zoneinfo import ZoneInfo
-from seed_data import get_day_info_from_gregorian, gregorian_to_bahai_date, get_feast_info
-import os
+from database import READ_YOUR_WRITES_SECONDS, SessionLocal, dialect_insert, engine, note_write, read_engines, read_session, wrote_recently
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from seed_data import get_bahai_year_layout, get_day_info_from_gregorian, gregorian_to_bahai_date, get_feast_info, month_feast
+from cache import CachedPayload, bahai_date_cache, get_or_build, get_or_build_async, invalidate_payloads, payload_cache, payload_response, upcoming_cache, year_calendar_cache
+from compression import MINIMUM_SIZE, THREADPOOL_MIN_SIZE, compress, negotiate_encoding
+from fieldsets import load_columns, parse_fields, parse_include, project, projected_response, refresh_projection
+import asyncio
+import json
+import math
+import threading
+import time
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
-from supabase import create_client, Client
+from supabase_client import SupabaseError, create_supabase_client
+from replication import SYNC_ENABLED, ReplicationWorker, record_changes
+from idempotency import remember, replay, request_fingerprint
+from metrics import metrics
+from versioning import VERSIONED_MODELS, current_version, next_version, row_columns, stamp
+from read_model import day_dates, day_readings_body, load_day_payload, refresh_day_payloads, upsert_day_payload
+from prewarm import Prewarmer, period_for
+from passages import passages_insert, stored_source_book
+from concurrency import ReadSlot, configure_threadpool, db_slot, is_read_request, supabase_slot
+from health import database_status, warmup
+from access_log import RequestStats, log_request, request_stats, start_listener, stop_listener
+from profiling import PROFILE_HEADER, PROFILE_ID_HEADER, StackSampler, new_profile_id, should_profile, write_profile
 
 # Charger les variables d'environnement
 load_dotenv()
 
-# Configuration Supabase
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-
-# Initialiser le client Supabase
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY) if SUPABASE_URL and SUPABASE_KEY else None
+# Client Supabase asynchrone (SUPABASE_URL / SUPABASE_KEY), partagé par toutes les requêtes
+supabase = create_supabase_client()
 
 models.Base.metadata.create_all(bind=engine)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Réplication vers Supabase en arrière-plan, hors du chemin des requêtes
+    replication_worker = ReplicationWorker(supabase) if supabase is not None and SYNC_ENABLED else None
+    if replication_worker is not None:
+        replication_worker.start()
+    # Pré-calcul des réponses avant chaque bascule matin/soir
+    prewarmer = Prewarmer(warm_next_period, TIMEZONE)
+    prewarmer.start()
+    access_log_listener = start_listener()
+    configure_threadpool()
+    # Préchauffage en arrière-plan: /readyz ne passe à 200 qu'une fois terminé
+    warmup_task = asyncio.create_task(run_in_threadpool(warmup.run, warm_up))
+    yield
+    await warmup_task
+    stop_listener(access_log_listener)
+    await prewarmer.stop()
+    if replication_worker is not None:
+        await replication_worker.stop()
+    if supabase is not None:
+        await supabase.aclose()
+
 app = FastAPI(
     title="API Lectures Bahá'íes",
     description="API pour les lectures quotidiennes bahá'íes avec support Supabase",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configuration CORS pour permettre l'accès depuis Swagger UI
@@ -47,6 +93,88 @@ async def add_unicode_support(request, call_next):
     response.headers["Content-Type"] = "application/json; charset=utf-8"
     return response
 
+# Compression à la volée des réponses qui ne sont pas déjà précompressées (cache)
+@app.middleware("http")
+async def compress_response(request, call_next):
+    response = await call_next(request)
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+    content_length = response.headers.get("content-length")
+    if (
+        encoding is None
+        or "content-encoding" in response.headers
+        or content_length is None
+        or int(content_length) < MINIMUM_SIZE
+    ):
+        return response
+    
+    body = b"".join([chunk async for chunk in response.body_iterator])
+    if len(body) >= THREADPOOL_MIN_SIZE:
+        content = await run_in_threadpool(compress, body, encoding, fast=True)
+    else:
+        content = compress(body, encoding, fast=True)
+    compressed = Response(content=content, status_code=response.status_code)
+    compressed.raw_headers = [
+        (name, value) for name, value in response.raw_headers if name != b"content-length"
+    ] + [(b"content-length", str(len(content)).encode())]
+    compressed.headers["Content-Encoding"] = encoding
+    compressed.headers.add_vary_header("Accept-Encoding")
+    return compressed
+
+# Profilage à la demande (en-tête X-Profile administrateur ou échantillonnage), voir profiling.py
+@app.middleware("http")
+async def profile_request(request, call_next):
+    if not should_profile(request.headers.get(PROFILE_HEADER)):
+        return await call_next(request)
+    
+    profile_id = new_profile_id()
+    sampler = StackSampler(threading.get_ident())
+    sampler.start()
+    try:
+        response = await call_next(request)
+    finally:
+        sampler.stop()
+    await run_in_threadpool(write_profile, profile_id, sampler, f"{request.method} {request.url.path}")
+    metrics.incr("profile.requests")
+    response.headers[PROFILE_ID_HEADER] = profile_id
+    return response
+
+# Read-your-writes: après une écriture réussie, le client lit sur la base principale
+# pendant READ_YOUR_WRITES_SECONDS (cookie), le temps que les réplicas rattrapent
+READ_YOUR_WRITES_COOKIE = "primary_until"
+
+@app.middleware("http")
+async def read_your_writes(request, call_next):
+    response = await call_next(request)
+    if not is_read_request(request) and response.status_code < 400:
+        note_write()
+        if read_engines:
+            response.set_cookie(
+                READ_YOUR_WRITES_COOKIE,
+                str(time.time() + READ_YOUR_WRITES_SECONDS),
+                max_age=int(math.ceil(READ_YOUR_WRITES_SECONDS)),
+                httponly=True,
+                samesite="lax"
+            )
+    return response
+
+# Journal d'accès JSON (écrit par un thread dédié via une file), voir access_log.py
+@app.middleware("http")
+async def log_access(request, call_next):
+    stats = RequestStats()
+    token = request_stats.set(stats)
+    started = time.perf_counter()
+    status_code, response_bytes = 500, None
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        content_length = response.headers.get("content-length")
+        response_bytes = int(content_length) if content_length is not None else None
+        return response
+    finally:
+        route = request.scope.get("route")
+        log_request(request.method, route.path if route is not None else request.url.path, status_code, time.perf_counter() - started, stats, response_bytes)
+        request_stats.reset(token)
+
 # Fuseau horaire pour Kinshasa (UTC+1)
 TIMEZONE = ZoneInfo("Africa/Kinshasa")
 
@@ -54,148 +182,445 @@ def get_current_date() -> date:
     """Retourne la date actuelle dans le fuseau horaire de Kinshasa"""
     return datetime.now(TIMEZONE).date()
 
+def resolve_timezone(tz: Optional[str]) -> ZoneInfo:
+    """Fuseau IANA demandé par le client (ex: Europe/Paris), Kinshasa par défaut"""
+    if not tz:
+        return TIMEZONE
+    try:
+        return ZoneInfo(tz)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise HTTPException(status_code=400, detail=f"Fuseau horaire inconnu: {tz}. Utilisez un nom IANA (ex: Europe/Paris)")
+
+FIELDS_DESCRIPTION = "Colonnes à retourner, séparées par des virgules (ex: id,period,reference)"
+INCLUDE_DESCRIPTION = "Relations imbriquées à inclure, séparées par des virgules"
+
 # Dépendance
-def get_db():
-    db = SessionLocal()
+def use_primary(request: Request) -> bool:
+    """Écritures, et lectures pendant la fenêtre read-your-writes (cookie du client ou écriture récente du processus)."""
+    if not is_read_request(request) or wrote_recently():
+        return True
+    try:
+        return float(request.cookies.get(READ_YOUR_WRITES_COOKIE, "0")) > time.time()
+    except ValueError:
+        return False
+
+def open_session(request: Request, slot: Optional[ReadSlot]) -> Session:
+    """Session primaire ou réplica; pour une lecture, la place du groupe est prise à la première requête SQL."""
+    db = SessionLocal() if use_primary(request) else read_session()
+    return slot.bind(db) if slot is not None else db
+
+def get_db(request: Request, slot: Optional[ReadSlot] = Depends(db_slot)):
+    db = open_session(request, slot)
     try:
         yield db
     finally:
         db.close()
 
-@app.get("/readings/today", response_model=schemas.APIResponse[schemas.Reading])
-def get_readings_today(db: Session = Depends(get_db)):
-    today = get_current_date()
-    now = datetime.now(TIMEZONE)
-    current_hour = now.hour
-    
-    # Déterminer la période: matin (0h-12h59) ou soir (13h-23h59)
-    period = "matin" if current_hour < 13 else "soir"
-    
-    day = db.query(models.Day).filter(models.Day.date == today).first()
+def build_readings_today_payload(db: Session, today: date, period: str, fields: Optional[Tuple[str, ...]] = None) -> CachedPayload:
+    day = db.scalars(queries.day_by_date(fields and ("period",) + fields), {"day_date": today}).first()
     if day is None:
-        return schemas.APIResponse(code=404, message="No readings found for today", data=None)
+        response = schemas.APIResponse[schemas.Reading](code=404, message="No readings found for today", data=None)
+        return CachedPayload.build(response.model_dump_json().encode())
     
     # Filtrer pour obtenir uniquement la lecture de la période actuelle
     reading = next((r for r in day.readings if r.period == period), None)
     if reading is None:
-        return schemas.APIResponse(code=404, message=f"No reading found for period '{period}'", data=None)
+        response = schemas.APIResponse[schemas.Reading](code=404, message=f"No reading found for period '{period}'", data=None)
+        return CachedPayload.build(response.model_dump_json().encode())
     
-    return schemas.APIResponse(data=reading, message=f"Reading for {period}")
-
+    if fields:
+        response = schemas.APIResponse[Any](data=project(reading, fields), message=f"Reading for {period}")
+    else:
+        response = schemas.APIResponse[schemas.Reading](data=reading, message=f"Reading for {period}")
+    return CachedPayload.build(response.model_dump_json().encode())
 
-@app.get("/readings/{date_str}", response_model=schemas.APIResponse[List[schemas.Reading]])
-def get_readings_by_date(date_str: str, db: Session = Depends(get_db)):
-    try:
-        requested_date = date.fromisoformat(date_str)
-        day = db.query(models.Day).filter(models.Day.date == requested_date).first()
-        if day is None:
-            return schemas.APIResponse(code=404, message="Date not found", data=[])
-        return schemas.APIResponse(data=day.readings)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Format de date invalide. Utilisez YYYY-MM-DD")
+def build_readings_by_date_payload(db: Session, requested_date: date, fields: Optional[Tuple[str, ...]] = None) -> CachedPayload:
+    # Réponse complète: lecture par clé primaire du payload maintenu à l'écriture
+    if not fields:
+        payload = load_day_payload(db, requested_date)
+        if payload is not None:
+            return payload
+    day = db.scalars(queries.day_by_date(fields), {"day_date": requested_date}).first()
+    if day is None:
+        response = schemas.APIResponse[List[schemas.Reading]](code=404, message="Date not found", data=[])
+    elif fields:
+        response = schemas.APIResponse[Any](data=[project(reading, fields) for reading in day.readings])
+    else:
+        return CachedPayload.build(day_readings_body(day.readings))
+    return CachedPayload.build(response.model_dump_json().encode())
 
-@app.get("/readings/month/{month_name}", response_model=schemas.APIResponse[schemas.MonthlyReadingsResponse])
-def get_readings_by_month(month_name: str, db: Session = Depends(get_db)):
-    month = db.query(models.Month).filter(models.Month.name == month_name).first()
+def build_readings_by_month_payload(db: Session, month_name: str, fields: Optional[Tuple[str, ...]] = None) -> CachedPayload:
+    month = db.scalars(queries.month_by_name(fields), {"month_name": month_name}).first()
     if month is None:
-        return schemas.APIResponse(code=404, message="Month not found")
+        response = schemas.APIResponse[schemas.MonthlyReadingsResponse](code=404, message="Month not found")
+        return CachedPayload.build(response.model_dump_json().encode())
     
     readings = []
     for day in month.days:
         readings.extend(day.readings)
     
+    if fields:
+        response = schemas.APIResponse[Any](data={
+            "id": month.id,
+            "month": month_name,
+            "count": len(readings),
+            "readings": [project(reading, fields) for reading in readings],
+        })
+        return CachedPayload.build(response.model_dump_json().encode())
+    
     response_data = schemas.MonthlyReadingsResponse(
         id=month.id,
         month=month_name,
         count=len(readings),
         readings=readings
     )
-    return schemas.APIResponse(data=response_data)
+    response = schemas.APIResponse[schemas.MonthlyReadingsResponse](data=response_data)
+    return CachedPayload.build(response.model_dump_json().encode())
+
+@app.get("/readings/today", response_model=schemas.APIResponse[schemas.Reading])
+def get_readings_today(
+    request: Request,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    tz: Optional[str] = Query(None, description="Fuseau horaire IANA du client (ex: Europe/Paris). Défaut: Africa/Kinshasa"),
+    x_timezone: Optional[str] = Header(None, alias="X-Timezone", description="Fuseau horaire IANA, si `tz` est absent"),
+    db: Session = Depends(get_db)
+):
+    selected = parse_fields(models.Reading, fields)
+    now = datetime.now(resolve_timezone(tz or x_timezone))
+    today = now.date()
+    
+    # Déterminer la période locale: matin (0h-12h59) ou soir (13h-23h59)
+    period = period_for(now)
+    
+    # La clé ne dépend que de (date locale, période): tous les fuseaux partagent au plus
+    # quelques entrées, quel que soit leur nombre
+    key = ("today", today, period, selected)
+    payload = get_or_build(key, lambda: build_readings_today_payload(db, today, period, selected))
+    return payload_response(request, payload)
+
+
+UPCOMING_MAX_DAYS = 90
+UPCOMING_CACHE_CONTROL = "public, max-age=3600"
+
+def build_upcoming_payload(db: Session, start: date, days: int) -> CachedPayload:
+    end = start + timedelta(days=days - 1)
+    stored_days = {day.date: day for day in db.scalars(queries.days_between, {"start": start, "end": end})}
+    months = {month.number: month for month in db.scalars(queries.month_labels)}
+    
+    bundle = []
+    for offset in range(days):
+        current = start + timedelta(days=offset)
+        bahai_day, bahai_month, bahai_year = gregorian_to_bahai_date(current)
+        month = months.get(bahai_month)
+        day = stored_days.get(current)
+        bundle.append({
+            "date": current.isoformat(),
+            "bahai": {
+                "day": bahai_day,
+                "month": bahai_month,
+                "year": bahai_year,
+                "month_name": month.name if month else None,
+                "month_translation": month.translation if month else None
+            },
+            "title": day.title if day else None,
+            "special_event": day.special_event if day else None,
+            "readings": [
+                {
+                    "period": reading.period,
+                    "content": reading.content,
+                    "author": reading.author,
+                    "reference": reading.reference,
+                    "source_book": reading.source_book,
+                    "page": reading.page
+                }
+                for reading in day.readings
+            ] if day else []
+        })
+    
+    response = schemas.APIResponse(message=f"{days} jour(s) à partir du {start.isoformat()}", data={"start": start.isoformat(), "days": bundle})
+    return CachedPayload.build(response.model_dump_json().encode())
+
+@app.get("/readings/upcoming", summary="Paquet hors ligne des prochains jours")
+def get_upcoming_readings(request: Request, days: int = Query(30, ge=1, le=UPCOMING_MAX_DAYS, description="Nombre de jours à partir d'aujourd'hui"), db: Session = Depends(get_db)):
+    """
+    Retourne en un seul paquet les lectures et la date Baha'i des `days` prochains jours
+    (à partir d'aujourd'hui, fuseau de Kinshasa), pour une consultation hors ligne.
+    Le paquet est calculé une fois par jour, stocké compressé et partagé par tous les
+    clients; l'ETag permet de ne retélécharger qu'en cas de changement.
+    """
+    today = get_current_date()
+    payload = get_or_build(("upcoming", today, days), lambda: build_upcoming_payload(db, today, days), cache=upcoming_cache)
+    return payload_response(request, payload, cache_control=UPCOMING_CACHE_CONTROL)
+
+@app.post("/readings/batch", response_model=schemas.APIResponse[schemas.ReadingsBatchResponse], summary="Lectures de plusieurs dates en une requête")
+def get_readings_batch(batch: schemas.ReadingsBatchRequest, fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION), db: Session = Depends(get_db)):
+    """
+    Retourne les lectures de jusqu'à 5000 dates (format YYYY-MM-DD) en une seule requête SQL
+    (`IN` avec les lectures chargées par jointure). La réponse est indexée par date; une date
+    absente de la base vaut `null` au lieu d'une erreur 404 par date.
+    """
+    selected = parse_fields(models.Reading, fields)
+    requested = list(dict.fromkeys(batch.dates))
+    days = (
+        db.query(models.Day)
+        .options(
+            load_only(models.Day.id, models.Day.date),
+            joinedload(models.Day.readings).options(load_columns(models.Reading, selected)),
+        )
+        .filter(models.Day.date.in_(requested))
+        .all()
+    )
+    by_date = {day.date: day.readings for day in days}
+    missing = sum(1 for requested_date in requested if requested_date not in by_date)
+    message = f"{len(requested) - missing} date(s) trouvée(s), {missing} absente(s)"
+    if selected:
+        data = {
+            requested_date.isoformat(): [project(reading, selected) for reading in by_date[requested_date]] if requested_date in by_date else None
+            for requested_date in requested
+        }
+        return projected_response(data, message=message)
+    data = {requested_date.isoformat(): by_date.get(requested_date) for requested_date in requested}
+    response = schemas.APIResponse[schemas.ReadingsBatchResponse](data=data, message=message)
+    return Response(content=response.model_dump_json(), media_type="application/json")
+
+@app.get("/readings/{date_str}", response_model=schemas.APIResponse[List[schemas.Reading]])
+def get_readings_by_date(date_str: str, request: Request, fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION), db: Session = Depends(get_db)):
+    try:
+        requested_date = date.fromisoformat(date_str)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Format de date invalide. Utilisez YYYY-MM-DD")
+    selected = parse_fields(models.Reading, fields)
+    
+    key = ("date", requested_date, selected)
+    payload = get_or_build(key, lambda: build_readings_by_date_payload(db, requested_date, selected))
+    return payload_response(request, payload)
+
+@app.get("/readings/month/{month_name}", response_model=schemas.APIResponse[schemas.MonthlyReadingsResponse])
+def get_readings_by_month(month_name: str, request: Request, fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION), db: Session = Depends(get_db)):
+    selected = parse_fields(models.Reading, fields)
+    key = ("month", month_name, selected)
+    payload = get_or_build(key, lambda: build_readings_by_month_payload(db, month_name, selected))
+    return payload_response(request, payload)
+
+EVENTS_BATCH_SIZE = 500
+
+def stream_events(db: Session, result) -> Iterator[bytes]:
+    """Enveloppe APIResponse écrite par lots de lignes, sans modèles Pydantic intermédiaires."""
+    try:
+        yield b'{"code":200,"message":"Success","data":['
+        separator = ""
+        for rows in result.partitions():
+            chunk = ",".join(
+                json.dumps({"date": row.date.isoformat(), "event": row.special_event}, ensure_ascii=False, separators=(",", ":"))
+                for row in rows
+            )
+            yield (separator + chunk).encode()
+            separator = ","
+        yield b"]}"
+    finally:
+        db.close()
 
 @app.get("/events", response_model=schemas.APIResponse[List[schemas.Event]])
-def get_special_events(db: Session = Depends(get_db)):
-    days = db.query(models.Day).filter(models.Day.special_event.isnot(None)).all()
-    events = [schemas.Event(date=day.date, event=day.special_event) for day in days]
-    return schemas.APIResponse(data=events)
+def get_special_events(
+    request: Request,
+    date_from: Optional[date] = Query(None, alias="from", description="Première date incluse (YYYY-MM-DD)"),
+    date_to: Optional[date] = Query(None, alias="to", description="Dernière date incluse (YYYY-MM-DD)"),
+    year: Optional[int] = Query(None, description="Année Baha'i (ex: 182) ou grégorienne à partir de 1844, comme /bahai/year/{year}"),
+    slot: Optional[ReadSlot] = Depends(db_slot)
+):
+    """
+    Événements spéciaux (date, nom) par date, filtrables par période et par année Baha'i.
+    Seules les deux colonnes sont lues, depuis l'index partiel `ix_days_special_events`;
+    la réponse est envoyée au fil de la lecture (curseur par lots de 500 lignes).
+    """
+    if date_from is not None and date_to is not None and date_from > date_to:
+        raise HTTPException(status_code=400, detail="`from` doit précéder `to`")
+    start, end = date_from, date_to
+    if year is not None:
+        try:
+            layout = get_bahai_year_layout(resolve_bahai_year(year))
+        except (ValueError, OverflowError):
+            raise HTTPException(status_code=400, detail=f"Année hors limites: {year}")
+        start = max(start, layout["start"]) if start else layout["start"]
+        end = min(end, layout["end"]) if end else layout["end"]
+    
+    if start is None and end is None:
+        stmt, params = queries.special_events, {}
+    else:
+        stmt, params = queries.special_events_between, {"start": start or date.min, "end": end or date.max}
+    # Session propre à la réponse: le flux est lu après la fin du handler, la session est fermée en fin de flux
+    db = open_session(request, slot)
+    try:
+        result = db.execute(stmt.execution_options(yield_per=EVENTS_BATCH_SIZE), params)
+    except Exception:
+        db.close()
+        raise
+    return StreamingResponse(stream_events(db, result), media_type="application/json", background=BackgroundTask(db.close))
 
 @app.get("/books", response_model=schemas.APIResponse[List[schemas.Book]])
-def get_books(db: Session = Depends(get_db)):
+def get_books(fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION), db: Session = Depends(get_db)):
+    selected = parse_fields(models.Book, fields)
+    if selected:
+        books = db.query(models.Book).options(load_columns(models.Book, selected)).all()
+        return projected_response([project(book, selected) for book in books])
     books = db.query(models.Book).all()
     return schemas.APIResponse(data=books)
 
 @app.post("/readings/daily/", response_model=schemas.APIResponse[schemas.Day], status_code=status.HTTP_201_CREATED, summary="Create daily readings (morning and evening)")
-def create_daily_readings(daily_readings: schemas.DailyReadingsCreate, db: Session = Depends(get_db)):
+def create_daily_readings(daily_readings: schemas.DailyReadingsCreate, fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION), include: Optional[str] = Query(None, description=INCLUDE_DESCRIPTION), idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"), db: Session = Depends(get_db)):
     """
-    Créer une nouvelle journée avec ses lectures du matin et du soir.
+    Créer (ou remplacer) une journée avec ses lectures du matin et du soir.
     Accepte tous les caractères Unicode (accents, apostrophes, etc.)
+    
+    Le jour puis les deux lectures sont écrits par `INSERT ... ON CONFLICT ... RETURNING`:
+    rappeler l'endpoint pour la même date met à jour les lectures existantes au lieu de
+    les dupliquer. Sous PostgreSQL, les textes nouveaux partent dans la requête des
+    lectures (CTE d'écriture); SQLite les insère dans une requête à part. S'y ajoutent
+    l'horloge de version, le payload de /readings/{date} et l'outbox de synchronisation.
+    Avec un en-tête
+    `Idempotency-Key`, un nouvel essai du client rejoue la réponse sans toucher à la base.
     """
-    month = db.query(models.Month).filter(models.Month.id == daily_readings.month_id).first()
-    if not month:
-        return schemas.APIResponse(code=404, message=f"Month with id {daily_readings.month_id} not found.")
+    selected = parse_fields(models.Day, fields)
+    included = parse_include(models.Day, include)
+    fingerprint = request_fingerprint(daily_readings.model_dump_json(), fields or "", include or "")
+    replayed = replay(idempotency_key, "daily-readings", fingerprint)
+    if replayed is not None:
+        return replayed
 
     # Conversion de la date si elle est une string
-    if isinstance(daily_readings.date, str):
-        try:
-            from datetime import datetime
-            reading_date = datetime.strptime(daily_readings.date, '%Y-%m-%d').date()
-        except ValueError:
-            raise HTTPException(status_code=400, detail=f"Format de date invalide: {daily_readings.date}. Utilisez YYYY-MM-DD")
-    else:
-        reading_date = daily_readings.date
+    try:
+        reading_date = datetime.strptime(daily_readings.date, '%Y-%m-%d').date()
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Format de date invalide: {daily_readings.date}. Utilisez YYYY-MM-DD")
 
-    day = db.query(models.Day).filter(models.Day.date == reading_date).first()
-    if not day:
-        day = models.Day(
-            date=reading_date,
-            title=daily_readings.title,
-            month_id=month.id
+    insert = dialect_insert(db)
+    try:
+        # Version de synchronisation (les INSERT Core ne passent pas par before_flush)
+        version_stamp = stamp(next_version(db))
+        
+        # Le jour, inséré seulement si le mois existe (INSERT ... SELECT)
+        day_stmt = insert(models.Day).from_select(
+            ["date", "title", "month_id", "version", "updated_at"],
+            select(
+                literal(reading_date, Date),
+                literal(daily_readings.title, String),
+                models.Month.id,
+                literal(version_stamp["version"], BigInteger),
+                literal(version_stamp["updated_at"], DateTime(timezone=True))
+            ).where(models.Month.id == daily_readings.month_id)
         )
-        db.add(day)
-        db.flush()
-    elif daily_readings.title:
-        day.title = daily_readings.title
-
-    # Création des lectures avec gestion des caractères Unicode
-    morning_reading = models.Reading(
-        period="matin",
-        content=daily_readings.morning_verse,
-        author=daily_readings.morning_author,
-        reference=daily_readings.morning_reference,
-        source_book=daily_readings.morning_reference or "Non spécifié",
-        day_id=day.id
-    )
-    evening_reading = models.Reading(
-        period="soir",
-        content=daily_readings.evening_verse,
-        author=daily_readings.evening_author,
-        reference=daily_readings.evening_reference,
-        source_book=daily_readings.evening_reference or "Non spécifié",
-        day_id=day.id
-    )
-    db.add_all([morning_reading, evening_reading])
+        day_stmt = day_stmt.on_conflict_do_update(
+            index_elements=[models.Day.date],
+            set_={
+                "title": func.coalesce(day_stmt.excluded.title, models.Day.title),
+                "version": day_stmt.excluded.version,
+                "updated_at": day_stmt.excluded.updated_at
+            }
+        ).returning(models.Day)
+        day = db.scalars(day_stmt).first()
+        if day is None:
+            db.rollback()
+            return schemas.APIResponse(code=404, message=f"Month with id {daily_readings.month_id} not found.")
 
-    try:
+        # Les textes, insérés seulement s'ils sont nouveaux (dédupliqués par empreinte)
+        verses = {"matin": daily_readings.morning_verse, "soir": daily_readings.evening_verse}
+        sources = {
+            "matin": daily_readings.morning_reference or "Non spécifié",
+            "soir": daily_readings.evening_reference or "Non spécifié",
+        }
+        hashes, passages_stmt = passages_insert(db, verses.values())
+
+        # Les deux lectures, remplacées si elles existent déjà
+        readings_stmt = insert(models.Reading).values([
+            {
+                "day_id": day.id,
+                "period": "matin",
+                "passage_hash": hashes[daily_readings.morning_verse],
+                "author": daily_readings.morning_author,
+                "reference": daily_readings.morning_reference,
+                "source_book": stored_source_book(sources["matin"], daily_readings.morning_reference),
+                **version_stamp,
+            },
+            {
+                "day_id": day.id,
+                "period": "soir",
+                "passage_hash": hashes[daily_readings.evening_verse],
+                "author": daily_readings.evening_author,
+                "reference": daily_readings.evening_reference,
+                "source_book": stored_source_book(sources["soir"], daily_readings.evening_reference),
+                **version_stamp,
+            },
+        ])
+        readings_stmt = readings_stmt.on_conflict_do_update(
+            index_elements=[models.Reading.day_id, models.Reading.period],
+            set_={
+                column: readings_stmt.excluded[column]
+                for column in ("passage_hash", "author", "reference", "source_book", "version", "updated_at")
+            }
+        ).returning(models.Reading)
+        if passages_stmt is not None and db.get_bind().dialect.name == "postgresql":
+            # Même requête que les lectures: la clé étrangère est vérifiée en fin d'instruction
+            readings_stmt = readings_stmt.add_cte(passages_stmt.cte("new_passages"))
+        elif passages_stmt is not None:
+            db.execute(passages_stmt)
+        readings = db.scalars(readings_stmt).all()
+        # Les lectures retournées suffisent: pas de rechargement de la relation ni des textes
+        for reading in readings:
+            set_committed_value(reading, "content", verses[reading.period])
+            set_committed_value(reading, "source_book", sources[reading.period])
+        set_committed_value(day, "readings", readings)
+        response = projected_response(project(day, selected, included), code=201, message=f"Readings for {daily_readings.date} created successfully", status_code=201)
+
+        upsert_day_payload(db, reading_date, readings)
+        record_changes(db, "days", [day.id])
+        record_changes(db, "readings", [reading.id for reading in readings])
         db.commit()
-        db.refresh(day)
-        return schemas.APIResponse(code=201, message=f"Readings for {daily_readings.date} created successfully", data=day)
+        invalidate_payloads()
+        return remember(idempotency_key, "daily-readings", fingerprint, response)
+    except HTTPException:
+        db.rollback()
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=400, detail=f"Error creating daily readings: {str(e)}")
 
 @app.post("/months/", response_model=schemas.APIResponse[schemas.Month], status_code=status.HTTP_201_CREATED)
-def create_month(month: schemas.MonthCreate, db: Session = Depends(get_db)):
-    db_month = models.Month(**month.model_dump())
-    db.add(db_month)
+def create_month(month: schemas.MonthCreate, fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION), include: Optional[str] = Query(None, description=INCLUDE_DESCRIPTION), db: Session = Depends(get_db)):
+    """
+    Crée un mois. L'unicité du numéro est garantie par la base: un seul
+    `INSERT ... ON CONFLICT DO NOTHING RETURNING`, 409 si le numéro existe déjà.
+    """
+    selected = parse_fields(models.Month, fields)
+    included = parse_include(models.Month, include)
+    insert = dialect_insert(db)
     try:
-        db.commit()
-        db.refresh(db_month)
-        return schemas.APIResponse(code=201, message="Month created successfully", data=db_month)
+        stmt = (
+            insert(models.Month)
+            .values(**month.model_dump(), **stamp(next_version(db)))
+            .on_conflict_do_nothing(index_elements=[models.Month.number])
+            .returning(models.Month)
+        )
+        db_month = db.scalars(stmt).first()
+        if db_month is not None:
+            response = projected_response(project(db_month, selected, included), code=201, message="Month created successfully", status_code=201)
+            record_changes(db, "months", [db_month.id])
+            db.commit()
+    except HTTPException:
+        db.rollback()
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=400, detail=f"Erreur lors de la création du mois: {str(e)}")
+    if db_month is None:
+        db.rollback()
+        raise HTTPException(status_code=409, detail=f"Un mois porte déjà le numéro {month.number}")
+    invalidate_payloads()
+    return response
 
 @app.post("/days/", response_model=schemas.APIResponse[schemas.Day], status_code=status.HTTP_201_CREATED)
-def create_day(day: schemas.DayCreate, db: Session = Depends(get_db)):
+def create_day(day: schemas.DayCreate, fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION), include: Optional[str] = Query(None, description=INCLUDE_DESCRIPTION), db: Session = Depends(get_db)):
+    selected = parse_fields(models.Day, fields)
+    included = parse_include(models.Day, include)
     month = db.query(models.Month).filter(models.Month.id == day.month_id).first()
     if not month:
         return schemas.APIResponse(code=404, message="Mois non trouvé")
@@ -203,15 +628,21 @@ def create_day(day: schemas.DayCreate, db: Session = Depends(get_db)):
     db_day = models.Day(**day.model_dump())
     db.add(db_day)
     try:
+        refresh_day_payloads(db, [db_day.date])
         db.commit()
-        db.refresh(db_day)
-        return schemas.APIResponse(code=201, message="Day created successfully", data=db_day)
+        invalidate_payloads()
+        refresh_projection(db, db_day, selected)
+        return projected_response(project(db_day, selected, included), code=201, message="Day created successfully", status_code=201)
+    except HTTPException:
+        db.rollback()
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=400, detail=f"Erreur lors de la création du jour: {str(e)}")
 
 @app.post("/readings/", response_model=schemas.APIResponse[schemas.Reading], status_code=status.HTTP_201_CREATED)
-def create_reading(reading: schemas.ReadingCreate, db: Session = Depends(get_db)):
+def create_reading(reading: schemas.ReadingCreate, fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION), db: Session = Depends(get_db)):
+    selected = parse_fields(models.Reading, fields)
     day = db.query(models.Day).filter(models.Day.id == reading.day_id).first()
     if not day:
         return schemas.APIResponse(code=404, message="Jour non trouvé")
@@ -222,34 +653,53 @@ def create_reading(reading: schemas.ReadingCreate, db: Session = Depends(get_db)
     db_reading = models.Reading(**reading.model_dump())
     db.add(db_reading)
     try:
+        refresh_day_payloads(db, [day.date])
         db.commit()
-        db.refresh(db_reading)
-        return schemas.APIResponse(code=201, message="Reading created successfully", data=db_reading)
+        invalidate_payloads()
+        refresh_projection(db, db_reading, selected)
+        return projected_response(project(db_reading, selected), code=201, message="Reading created successfully", status_code=201)
+    except HTTPException:
+        db.rollback()
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=400, detail=f"Erreur lors de la création de la lecture: {str(e)}")
 
 @app.post("/books/", response_model=schemas.APIResponse[schemas.Book], status_code=status.HTTP_201_CREATED)
-def create_book(book: schemas.BookCreate, db: Session = Depends(get_db)):
-    existing_book = db.query(models.Book).filter(
-        models.Book.title == book.title,
-        models.Book.author == book.author
-    ).first()
-    if existing_book:
-        raise HTTPException(status_code=400, detail="Ce livre existe déjà")
-    
-    db_book = models.Book(**book.model_dump())
-    db.add(db_book)
+def create_book(book: schemas.BookCreate, fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION), db: Session = Depends(get_db)):
+    """
+    Crée un livre. L'unicité (titre, auteur) est garantie par la base: un seul
+    `INSERT ... ON CONFLICT DO NOTHING RETURNING`, 409 si le livre existe déjà.
+    """
+    selected = parse_fields(models.Book, fields)
+    insert = dialect_insert(db)
     try:
-        db.commit()
-        db.refresh(db_book)
-        return schemas.APIResponse(code=201, message="Book created successfully", data=db_book)
+        stmt = (
+            insert(models.Book)
+            .values(**book.model_dump(), **stamp(next_version(db)))
+            .on_conflict_do_nothing(index_elements=[models.Book.title, models.Book.author])
+            .returning(models.Book)
+        )
+        db_book = db.scalars(stmt).first()
+        if db_book is not None:
+            response = projected_response(project(db_book, selected), code=201, message="Book created successfully", status_code=201)
+            record_changes(db, "books", [db_book.id])
+            db.commit()
+    except HTTPException:
+        db.rollback()
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=400, detail=f"Erreur lors de la création du livre: {str(e)}")
+    if db_book is None:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Ce livre existe déjà")
+    return response
 
 @app.put("/months/{month_id}", response_model=schemas.APIResponse[schemas.Month])
-def update_month(month_id: int, month: schemas.MonthUpdate, db: Session = Depends(get_db)):
+def update_month(month_id: int, month: schemas.MonthUpdate, fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION), include: Optional[str] = Query(None, description=INCLUDE_DESCRIPTION), db: Session = Depends(get_db)):
+    selected = parse_fields(models.Month, fields)
+    included = parse_include(models.Month, include)
     db_month = db.query(models.Month).filter(models.Month.id == month_id).first()
     if not db_month:
         return schemas.APIResponse(code=404, message="Mois non trouvé")
@@ -259,14 +709,23 @@ def update_month(month_id: int, month: schemas.MonthUpdate, db: Session = Depend
     
     try:
         db.commit()
-        db.refresh(db_month)
-        return schemas.APIResponse(data=db_month)
+        invalidate_payloads()
+        refresh_projection(db, db_month, selected)
+        return projected_response(project(db_month, selected, included))
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Un mois porte déjà ce numéro")
+    except HTTPException:
+        db.rollback()
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=400, detail=f"Erreur lors de la mise à jour: {str(e)}")
 
 @app.put("/days/{day_id}", response_model=schemas.APIResponse[schemas.Day])
-def update_day(day_id: int, day: schemas.DayUpdate, db: Session = Depends(get_db)):
+def update_day(day_id: int, day: schemas.DayUpdate, fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION), include: Optional[str] = Query(None, description=INCLUDE_DESCRIPTION), db: Session = Depends(get_db)):
+    selected = parse_fields(models.Day, fields)
+    included = parse_include(models.Day, include)
     db_day = db.query(models.Day).filter(models.Day.id == day_id).first()
     if not db_day:
         return schemas.APIResponse(code=404, message="Jour non trouvé")
@@ -276,19 +735,26 @@ def update_day(day_id: int, day: schemas.DayUpdate, db: Session = Depends(get_db
         if not month:
             return schemas.APIResponse(code=404, message="Mois spécifié non trouvé")
     
+    previous_date = db_day.date
     for field, value in day.model_dump(exclude_unset=True).items():
         setattr(db_day, field, value)
     
     try:
+        refresh_day_payloads(db, [previous_date, db_day.date])
         db.commit()
-        db.refresh(db_day)
-        return schemas.APIResponse(data=db_day)
+        invalidate_payloads()
+        refresh_projection(db, db_day, selected)
+        return projected_response(project(db_day, selected, included))
+    except HTTPException:
+        db.rollback()
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=400, detail=f"Erreur lors de la mise à jour: {str(e)}")
 
 @app.put("/readings/{reading_id}", response_model=schemas.APIResponse[schemas.Reading])
-def update_reading(reading_id: int, reading: schemas.ReadingUpdate, db: Session = Depends(get_db)):
+def update_reading(reading_id: int, reading: schemas.ReadingUpdate, fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION), db: Session = Depends(get_db)):
+    selected = parse_fields(models.Reading, fields)
     db_reading = db.query(models.Reading).filter(models.Reading.id == reading_id).first()
     if not db_reading:
         return schemas.APIResponse(code=404, message="Lecture non trouvée")
@@ -296,19 +762,26 @@ def update_reading(reading_id: int, reading: schemas.ReadingUpdate, db: Session
     if reading.period is not None and reading.period not in ["matin", "soir"]:
         raise HTTPException(status_code=400, detail="La période doit être 'matin' ou 'soir'")
     
+    previous_day_id = db_reading.day_id
     for field, value in reading.model_dump(exclude_unset=True).items():
         setattr(db_reading, field, value)
     
     try:
+        refresh_day_payloads(db, day_dates(db, [previous_day_id, db_reading.day_id]))
         db.commit()
-        db.refresh(db_reading)
-        return schemas.APIResponse(data=db_reading)
+        invalidate_payloads()
+        refresh_projection(db, db_reading, selected)
+        return projected_response(project(db_reading, selected))
+    except HTTPException:
+        db.rollback()
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=400, detail=f"Erreur lors de la mise à jour: {str(e)}")
 
 @app.put("/books/{book_id}", response_model=schemas.APIResponse[schemas.Book])
-def update_book(book_id: int, book: schemas.BookUpdate, db: Session = Depends(get_db)):
+def update_book(book_id: int, book: schemas.BookUpdate, fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION), db: Session = Depends(get_db)):
+    selected = parse_fields(models.Book, fields)
     db_book = db.query(models.Book).filter(models.Book.id == book_id).first()
     if not db_book:
         return schemas.APIResponse(code=404, message="Livre non trouvé")
@@ -318,119 +791,327 @@ def update_book(book_id: int, book: schemas.BookUpdate, db: Session = Depends(ge
     
     try:
         db.commit()
-        db.refresh(db_book)
-        return schemas.APIResponse(data=db_book)
+        refresh_projection(db, db_book, selected)
+        return projected_response(project(db_book, selected))
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Ce livre existe déjà")
+    except HTTPException:
+        db.rollback()
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=400, detail=f"Erreur lors de la mise à jour: {str(e)}")
 
+# Mises à jour et suppressions groupées (instructions ensemblistes, voir bulk_writes.py)
+
+def run_bulk(db: Session, operation, action: str):
+    """Exécute une opération groupée dans une transaction; conflit d'unicité = 409."""
+    try:
+        result = operation()
+        db.commit()
+    except HTTPException:
+        db.rollback()
+        raise
+    except IntegrityError as e:
+        db.rollback()
+        raise HTTPException(status_code=409, detail=f"Conflit lors de {action}: {str(e.orig)}")
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=f"Erreur lors de {action}: {str(e)}")
+    invalidate_payloads()
+    return result
+
+@app.patch("/readings", response_model=schemas.APIResponse[schemas.BulkUpdateResult], summary="Mise à jour groupée de lectures")
+def patch_readings(bulk: schemas.ReadingsBulkUpdate, db: Session = Depends(get_db)):
+    """
+    Applique jusqu'à 5000 mises à jour partielles (`id` + champs à modifier) en une
+    transaction: un UPDATE par combinaison de champs, exécuté en lot. Les ids absents
+    sont ignorés et listés dans `missing_ids`.
+    """
+    patches = [patch.model_dump(exclude_unset=True) for patch in bulk.updates]
+    updated, missing = run_bulk(db, lambda: bulk_writes.update_readings(db, patches), "la mise à jour groupée")
+    data = schemas.BulkUpdateResult(updated=len(updated), missing_ids=missing)
+    return schemas.APIResponse(data=data, message=f"{len(updated)} lecture(s) mise(s) à jour")
+
+@app.patch("/days", response_model=schemas.APIResponse[schemas.BulkUpdateResult], summary="Mise à jour groupée de jours")
+def patch_days(bulk: schemas.DaysBulkUpdate, db: Session = Depends(get_db)):
+    """
+    Applique jusqu'à 5000 mises à jour partielles de jours (`date`, `month_id`,
+    `special_event`; `null` efface l'événement) en une transaction.
+    """
+    patches = [patch.model_dump(exclude_unset=True) for patch in bulk.updates]
+    updated, missing = run_bulk(db, lambda: bulk_writes.update_days(db, patches), "la mise à jour groupée")
+    data = schemas.BulkUpdateResult(updated=len(updated), missing_ids=missing)
+    return schemas.APIResponse(data=data, message=f"{len(updated)} jour(s) mis à jour")
+
+@app.delete("/readings", response_model=schemas.APIResponse[schemas.BulkDeleteResult], summary="Suppression filtrée de lectures")
+def delete_readings(
+    day_id: Optional[int] = Query(None),
+    month_id: Optional[int] = Query(None),
+    period: Optional[str] = Query(None, description="matin ou soir"),
+    date_from: Optional[date] = Query(None, alias="from", description="Première date incluse (YYYY-MM-DD)"),
+    date_to: Optional[date] = Query(None, alias="to", description="Dernière date incluse (YYYY-MM-DD)"),
+    db: Session = Depends(get_db)
+):
+    """Supprime en une requête les lectures qui correspondent à tous les filtres (au moins un requis)."""
+    deleted = run_bulk(db, lambda: bulk_writes.delete_readings(db, day_id, month_id, period, date_from, date_to), "la suppression groupée")
+    return schemas.APIResponse(data=schemas.BulkDeleteResult(deleted=deleted), message=f"{deleted['readings']} lecture(s) supprimée(s)")
+
+@app.delete("/days", response_model=schemas.APIResponse[schemas.BulkDeleteResult], summary="Suppression filtrée de jours")
+def delete_days(
+    month_id: Optional[int] = Query(None),
+    date_from: Optional[date] = Query(None, alias="from", description="Première date incluse (YYYY-MM-DD)"),
+    date_to: Optional[date] = Query(None, alias="to", description="Dernière date incluse (YYYY-MM-DD)"),
+    db: Session = Depends(get_db)
+):
+    """Supprime les jours qui correspondent à tous les filtres (au moins un requis), avec leurs lectures."""
+    deleted = run_bulk(db, lambda: bulk_writes.delete_days(db, month_id, date_from, date_to), "la suppression groupée")
+    return schemas.APIResponse(data=schemas.BulkDeleteResult(deleted=deleted), message=f"{deleted['days']} jour(s) et {deleted['readings']} lecture(s) supprimé(s)")
+
 # Nouveaux endpoints pour la conversion de dates Baha'i
 
+def build_bahai_today_payload(db: Session, current_date: date) -> CachedPayload:
+    # Avec une session, les erreurs de base sont propagées: jamais de texte d'erreur mis en cache
+    info = get_day_info_from_gregorian(current_date, db)
+    feast_info = get_feast_info(current_date, db)
+    response = schemas.APIResponse(
+        code=200,
+        message="Informations du jour actuel",
+        data={
+            "date_info": info, 
+            "gregorian_date": current_date.isoformat(),
+            "feast": feast_info
+        }
+    )
+    return CachedPayload.build(response.model_dump_json().encode())
+
 @app.get("/bahai/today", summary="Informations Baha'i du jour actuel")
-def get_today_bahai():
+async def get_today_bahai(request: Request, db: Session = Depends(get_db)):
     """
     Retourne les informations du jour actuel au format Baha'i.
     Exemple: "26 SEP - 1 Asmá' (Noms - 9ème mois)"
     """
     try:
         current_date = get_current_date()
-        info = get_day_info_from_gregorian(current_date)
-        feast_info = get_feast_info(current_date)
-        return schemas.APIResponse(
-            code=200,
-            message="Informations du jour actuel",
-            data={
-                "date_info": info, 
-                "gregorian_date": current_date.isoformat(),
-                "feast": feast_info
-            }
-        )
+        payload = await get_or_build_async(("bahai-today", current_date), lambda: build_bahai_today_payload(db, current_date))
+        return payload_response(request, payload)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erreur lors de la récupération des informations: {str(e)}")
 
+def warm_next_period(target_date: date, period: str, seconds_left: float) -> None:
+    """Pré-calcule les réponses de /readings/today et /bahai/today pour la prochaine période.
+    
+    Les entrées sont rangées sous la clé que les requêtes utiliseront après la bascule:
+    celle-ci se résume alors à lire une autre entrée du cache. Leur TTL ne démarre
+    qu'à la bascule.
+    """
+    db = SessionLocal()
+    try:
+        today_payload = build_readings_today_payload(db, target_date, period)
+        bahai_payload = build_bahai_today_payload(db, target_date)
+    finally:
+        db.close()
+    for key, payload in ((("today", target_date, period, None), today_payload), (("bahai-today", target_date), bahai_payload)):
+        payload.created_at += seconds_left
+        payload_cache.set(key, payload)
+
+def warm_up() -> None:
+    """Préchauffe les réponses les plus demandées après un démarrage: lectures du jour
+    (période courante), /bahai/today et lectures du mois Baha'i courant."""
+    now = datetime.now(TIMEZONE)
+    warm_next_period(now.date(), period_for(now), 0)
+    _, bahai_month, _ = gregorian_to_bahai_date(now.date())
+    db = SessionLocal()
+    try:
+        month_name = db.scalar(queries.month_name_by_number, {"number": bahai_month})
+        if month_name is not None:
+            payload_cache.set(("month", month_name, None), build_readings_by_month_payload(db, month_name))
+    finally:
+        db.close()
+
+@app.get("/healthz", summary="Sonde de vie (aucune entrée/sortie)")
+async def healthz():
+    """Répond tant que le processus sert des requêtes; ne touche ni la base ni le réseau."""
+    return {"status": "ok"}
+
+@app.get("/readyz", summary="Sonde de disponibilité (base, migrations, caches chauds)")
+def readyz():
+    """
+    200 quand le worker peut recevoir du trafic: base joignable, schéma à la dernière
+    migration alembic et préchauffage terminé. 503 sinon, avec le détail de chaque contrôle.
+    L'état des caches (lectures du jour, mois courant) est indiqué sans conditionner la réponse:
+    ils expirent et se reconstruisent normalement ensuite.
+    """
+    database = database_status(engine)
+    now = datetime.now(TIMEZONE)
+    month_warm = False
+    if database["ok"]:
+        _, bahai_month, _ = gregorian_to_bahai_date(now.date())
+        db = SessionLocal()
+        try:
+            month_name = db.scalar(queries.month_name_by_number, {"number": bahai_month})
+        finally:
+            db.close()
+        month_warm = ("month", month_name, None) in payload_cache
+    checks = {
+        "database": database,
+        # Informatif: un réplica en panne ne rend pas le worker indisponible
+        "replicas": [database_status(read_engine) for read_engine in read_engines],
+        "warmup": warmup.status(),
+        "caches": {
+            "today": ("today", now.date(), period_for(now), None) in payload_cache,
+            "month": month_warm,
+        },
+    }
+    ready = database["ok"] and database["migrations"]["up_to_date"] is not False and warmup.done
+    if ready:
+        return projected_response(checks, message="Prêt")
+    return projected_response(checks, code=503, message="Pas encore prêt", status_code=503)
+
+def build_bahai_date_payload(db: Session, gregorian_date: date, gregorian_repr: Any, message: str) -> CachedPayload:
+    info = get_day_info_from_gregorian(gregorian_date, db)
+    feast_info = get_feast_info(gregorian_date, db)
+    bahai_day, bahai_month, bahai_year = gregorian_to_bahai_date(gregorian_date)
+    response = schemas.APIResponse(
+        code=200,
+        message=message,
+        data={
+            "gregorian_date": gregorian_repr,
+            "formatted_info": info,
+            "feast": feast_info,
+            "bahai_date": {
+                "day": bahai_day,
+                "month": bahai_month,
+                "year": bahai_year
+            }
+        }
+    )
+    return CachedPayload.build(response.model_dump_json().encode())
+
 @app.get("/bahai/date/{date_str}", summary="Conversion d'une date grégorienne vers le calendrier Baha'i")
-def get_bahai_date_info(date_str: str):
+def get_bahai_date_info(date_str: str, request: Request, db: Session = Depends(get_db)):
     """
     Convertit une date grégorienne (format YYYY-MM-DD) vers le calendrier Baha'i.
     Retourne les informations formatées.
     """
     try:
         gregorian_date = date.fromisoformat(date_str)
-        info = get_day_info_from_gregorian(gregorian_date)
-        feast_info = get_feast_info(gregorian_date)
-        bahai_day, bahai_month, bahai_year = gregorian_to_bahai_date(gregorian_date)
-        
-        return schemas.APIResponse(
-            code=200,
-            message=f"Conversion de la date {date_str}",
-            data={
-                "gregorian_date": date_str,
-                "formatted_info": info,
-                "feast": feast_info,
-                "bahai_date": {
-                    "day": bahai_day,
-                    "month": bahai_month,
-                    "year": bahai_year
-                }
-            }
-        )
     except ValueError:
         raise HTTPException(status_code=400, detail="Format de date invalide. Utilisez YYYY-MM-DD")
+    try:
+        payload = get_or_build(
+            ("date", date_str),
+            lambda: build_bahai_date_payload(db, gregorian_date, date_str, f"Conversion de la date {date_str}"),
+            cache=bahai_date_cache
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erreur lors de la conversion: {str(e)}")
+    return payload_response(request, payload)
 
 @app.get("/bahai/convert", summary="Conversion avec paramètres de requête")
-def convert_gregorian_to_bahai(year: int, month: int, day: int):
+def convert_gregorian_to_bahai(year: int, month: int, day: int, request: Request, db: Session = Depends(get_db)):
     """
     Convertit une date grégorienne vers le calendrier Baha'i en utilisant des paramètres séparés.
     """
     try:
         gregorian_date = date(year, month, day)
-        info = get_day_info_from_gregorian(gregorian_date)
-        feast_info = get_feast_info(gregorian_date)
-        bahai_day, bahai_month, bahai_year = gregorian_to_bahai_date(gregorian_date)
-        
-        return schemas.APIResponse(
-            code=200,
-            message=f"Conversion de la date {gregorian_date}",
-            data={
-                "gregorian_date": {
-                    "year": year,
-                    "month": month,
-                    "day": day,
-                    "iso_format": gregorian_date.isoformat()
-                },
-                "formatted_info": info,
-                "feast": feast_info,
-                "bahai_date": {
-                    "day": bahai_day,
-                    "month": bahai_month,
-                    "year": bahai_year
-                }
-            }
-        )
     except ValueError as e:
         raise HTTPException(status_code=400, detail=f"Date invalide: {str(e)}")
+    gregorian_repr = {
+        "year": year,
+        "month": month,
+        "day": day,
+        "iso_format": gregorian_date.isoformat()
+    }
+    try:
+        payload = get_or_build(
+            ("convert", gregorian_date),
+            lambda: build_bahai_date_payload(db, gregorian_date, gregorian_repr, f"Conversion de la date {gregorian_date}"),
+            cache=bahai_date_cache
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erreur lors de la conversion: {str(e)}")
+    return payload_response(request, payload)
+
+# Les années à partir de 1844 (début de l'ère Baha'i) sont lues comme grégoriennes
+FIRST_GREGORIAN_YEAR = 1844
+YEAR_CACHE_CONTROL = "public, max-age=86400, stale-while-revalidate=604800"
+
+def resolve_bahai_year(year: int) -> int:
+    """Année Baha'i d'un paramètre `year` (année Baha'i, ou grégorienne à partir de 1844)."""
+    bahai_year = year - (FIRST_GREGORIAN_YEAR - 1) if year >= FIRST_GREGORIAN_YEAR else year
+    if bahai_year < 1:
+        raise HTTPException(status_code=400, detail="L'année doit être une année Baha'i (>= 1) ou grégorienne (>= 1844)")
+    return bahai_year
+
+def build_bahai_year_payload(db: Session, bahai_year: int) -> CachedPayload:
+    layout = get_bahai_year_layout(bahai_year)
+    months = {month.number: month for month in db.scalars(queries.all_months)}
+    events = db.execute(queries.special_events_between, {"start": layout["start"], "end": layout["end"]}).all()
+    
+    response = schemas.APIResponse(
+        message=f"Calendrier de l'année Baha'i {bahai_year}",
+        data={
+            "bahai_year": bahai_year,
+            "gregorian_start": layout["start"].isoformat(),
+            "gregorian_end": layout["end"].isoformat(),
+            "months": [
+                {
+                    "number": number,
+                    "name": months[number].name if number in months else None,
+                    "translation": months[number].translation if number in months else None,
+                    "start": start.isoformat(),
+                    "end": end.isoformat(),
+                    # Chaque mois commence par sa fête: déduite des mois déjà chargés
+                    "feast": month_feast(months.get(number), number)
+                }
+                for number, start, end in layout["months"]
+            ],
+            "ayyam_i_ha": {
+                "start": layout["ayyam_i_ha"][0].isoformat(),
+                "end": layout["ayyam_i_ha"][1].isoformat()
+            },
+            "events": [{"date": event_date.isoformat(), "event": event} for event_date, event in events]
+        }
+    )
+    return CachedPayload.build(response.model_dump_json().encode())
+
+@app.get("/bahai/year/{year}", summary="Calendrier complet d'une année Baha'i")
+def get_bahai_year(year: int, request: Request, db: Session = Depends(get_db)):
+    """
+    Retourne les 19 mois d'une année Baha'i avec leurs dates grégoriennes de début et de fin,
+    la période d'Ayyám-i-Há, les fêtes de 19 jours et les événements spéciaux.
+    
+    `year` est une année Baha'i (ex: 182) ou grégorienne à partir de 1844 (ex: 2025 -> année
+    Baha'i commençant en mars 2025). Le calendrier est calculé une fois par année puis servi
+    depuis le cache, avec des en-têtes de cache HTTP longue durée.
+    """
+    bahai_year = resolve_bahai_year(year)
+    try:
+        payload = get_or_build(bahai_year, lambda: build_bahai_year_payload(db, bahai_year), cache=year_calendar_cache)
+    except (ValueError, OverflowError):
+        raise HTTPException(status_code=400, detail=f"Année hors limites: {year}")
+    return payload_response(request, payload, cache_control=YEAR_CACHE_CONTROL)
 
 # =================== ENDPOINTS SUPABASE ===================
 
-@app.get("/supabase/status")
-def get_supabase_status():
-    """Vérifier le statut de la connexion Supabase"""
+@app.get("/supabase/status", dependencies=[Depends(supabase_slot)])
+async def get_supabase_status():
+    """Vérifier le statut de la connexion Supabase (résultat mis en cache SUPABASE_HEALTH_TTL secondes)"""
     if supabase is None:
         return {"status": "error", "message": "Supabase n'est pas configuré"}
 
-    try:
-        # Test simple de connexion
-        response = supabase.table('test_data').select("*").limit(1).execute()
-        return {"status": "connected", "message": "Connexion Supabase réussie"}
-    except Exception as e:
-        return {"status": "error", "message": f"Erreur de connexion: {str(e)}"}
+    return await supabase.health()
 
-@app.get("/supabase/insert-test")
-def insert_test_data():
+@app.get("/supabase/insert-test", dependencies=[Depends(supabase_slot)])
+async def insert_test_data():
     """Insérer des données de test dans Supabase"""
     if supabase is None:
         raise HTTPException(status_code=500, detail="Supabase n'est pas configuré")
@@ -443,27 +1124,78 @@ def insert_test_data():
         }
 
         # Insérer dans une table de test (à créer dans Supabase)
-        response = supabase.table('test_data').insert(test_data).execute()
+        data = await supabase.insert('test_data', test_data)
 
         return {
             "status": "success",
             "message": "Données insérées avec succès",
-            "data": response.data
+            "data": data
         }
-    except Exception as e:
+    except SupabaseError as e:
         raise HTTPException(status_code=500, detail=f"Erreur lors de l'insertion: {str(e)}")
 
-@app.get("/supabase/test-data")
-def get_test_data():
+@app.get("/supabase/test-data", dependencies=[Depends(supabase_slot)])
+async def get_test_data():
     """Récupérer les données de test depuis Supabase"""
     if supabase is None:
         raise HTTPException(status_code=500, detail="Supabase n'est pas configuré")
 
     try:
-        response = supabase.table('test_data').select('*').execute()
+        data = await supabase.select('test_data')
         return {
             "status": "success",
-            "data": response.data
+            "data": data
         }
-    except Exception as e:
+    except SupabaseError as e:
         raise HTTPException(status_code=500, detail=f"Erreur lors de la récupération: {str(e)}")
+
+@app.get("/sync", summary="Synchronisation delta pour les clients hors ligne")
+def get_sync(since: Optional[str] = Query(None, description="Jeton retourné par la synchronisation précédente (absent = tout)"), db: Session = Depends(get_db)):
+    """
+    Retourne uniquement les mois, jours, lectures et livres modifiés depuis le jeton `since`,
+    ainsi que les ids supprimés. Les lignes sont au format colonnes + valeurs pour rester
+    compactes; la réponse est compressée si le client l'accepte. Le client conserve `token`
+    et le renvoie au prochain appel.
+    """
+    try:
+        since_version = int(since) if since else 0
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Jeton de synchronisation invalide")
+    
+    # Borne haute lue avant les tables: les écritures postérieures seront vues au prochain appel
+    until_version = current_version(db)
+    changes = {}
+    for model in VERSIONED_MODELS:
+        selected_columns = row_columns(model)
+        rows = db.execute(
+            select(*selected_columns)
+            .where(model.version > since_version, model.version <= until_version)
+            .order_by(model.version)
+        ).all()
+        if rows:
+            changes[model.__tablename__] = {"columns": [column.key for column in selected_columns], "rows": [list(row) for row in rows]}
+    
+    # Une suppression suivie d'une recréation du même id (ids réutilisés par une ancienne base
+    # SQLite) n'est pas renvoyée: la ligne vivante, plus récente, figure déjà dans `changes`
+    recreated = or_(*(
+        and_(
+            models.Tombstone.table_name == model.__tablename__,
+            exists().where(model.id == models.Tombstone.row_id, model.version > models.Tombstone.version)
+        )
+        for model in VERSIONED_MODELS
+    ))
+    deleted = {}
+    tombstones = db.execute(
+        select(models.Tombstone.table_name, models.Tombstone.row_id)
+        .where(models.Tombstone.version > since_version, models.Tombstone.version <= until_version, ~recreated)
+        .order_by(models.Tombstone.version)
+    ).all()
+    for table_name, row_id in tombstones:
+        deleted.setdefault(table_name, []).append(row_id)
+    
+    return projected_response({"token": str(until_version), "changes": changes, "deleted": deleted})
+
+@app.get("/metrics", summary="Métriques internes du processus")
+def get_metrics():
+    """Compteurs et durées (pré-calcul des périodes, etc.) du worker courant"""
+    return metrics.snapshot()
@@ -1,9 +1,19 @@
-from sqlalchemy import Column, Integer, String, Date, Text, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, BigInteger, String, Date, DateTime, Text, ForeignKey, Index, LargeBinary, func, select
+from sqlalchemy.orm import column_property, relationship
 from database import Base
+from passage_storage import PassageText
 
-class Month(Base):
+class VersionedMixin:
+    """Suivi des modifications pour la synchronisation delta (renseigné par versioning.py)"""
+    version = Column(BigInteger, index=True)  # valeur de l'horloge globale à la dernière écriture
+    updated_at = Column(DateTime(timezone=True))
+
+class Month(VersionedMixin, Base):
     __tablename__ = "months"
+    # Un seul mois par numéro (cible des INSERT ... ON CONFLICT de create_month et seed_months).
+    # Tables versionnées: ids jamais réutilisés après suppression (sinon /sync renverrait le même
+    # id comme modifié et supprimé)
+    __table_args__ = (Index("uq_months_number", "number", unique=True), {"sqlite_autoincrement": True})
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(50))
@@ -12,36 +22,123 @@ class Month(Base):
     
     days = relationship("Day", back_populates="month")
 
-class Day(Base):
+class Day(VersionedMixin, Base):
     __tablename__ = "days"
     
     id = Column(Integer, primary_key=True, index=True)
-    date = Column(Date)
+    date = Column(Date, unique=True, index=True)
     title = Column(String, nullable=True)
     month_id = Column(Integer, ForeignKey("months.id"))
     special_event = Column(Text, nullable=True)
     
+    # Index partiel couvrant de /events: seuls les jours avec un événement, lus dans l'ordre des dates sans toucher la table
+    __table_args__ = (
+        Index(
+            "ix_days_special_events", date, special_event,
+            postgresql_where=special_event.isnot(None),
+            sqlite_where=special_event.isnot(None),
+        ),
+        {"sqlite_autoincrement": True},
+    )
+    
     month = relationship("Month", back_populates="days")
     readings = relationship("Reading", back_populates="day")
 
-class Reading(Base):
+class Passage(Base):
+    """Texte d'un passage, stocké une seule fois et adressé par son empreinte SHA-256"""
+    __tablename__ = "passages"
+    
+    hash = Column(String(64), primary_key=True)
+    content = Column(PassageText, nullable=False)  # UTF-8 ou trame zstd (PASSAGE_STORAGE)
+
+class CompressionDictionary(Base):
+    """Dictionnaire zstd entraîné sur les passages (id = identifiant inscrit dans les trames)"""
+    __tablename__ = "compression_dictionaries"
+    
+    id = Column(BigInteger, primary_key=True, autoincrement=False)
+    data = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime(timezone=True))
+
+class Reading(VersionedMixin, Base):
     __tablename__ = "readings"
+    # Une seule lecture par période et par jour (cible des upserts ON CONFLICT)
+    __table_args__ = (Index("uq_readings_day_period", "day_id", "period", unique=True), {"sqlite_autoincrement": True})
     
     id = Column(Integer, primary_key=True, index=True)
     day_id = Column(Integer, ForeignKey("days.id"))
     period = Column(String(20))  # matin ou soir
-    content = Column(Text)
     author = Column(String(100))
-    source_book = Column(String(200))
     page = Column(String(50))
     reference = Column(String(50))
     
+    # Stockage: empreinte du passage partagé, et source seulement si elle diffère de la référence
+    # (renseignés par passages.py à partir de `content` / `source_book`)
+    _passage_hash = Column("passage_hash", String(64), ForeignKey("passages.hash"), index=True)
+    _source_book = Column("source_book", String(200))
+    
+    content = column_property(
+        select(Passage.content).where(Passage.hash == _passage_hash).correlate_except(Passage).scalar_subquery()
+    )
+    source_book = column_property(func.coalesce(_source_book, reference))
+    
     day = relationship("Day", back_populates="readings")
 
-class Book(Base):
+class Book(VersionedMixin, Base):
     __tablename__ = "books"
+    # Un seul livre par titre et auteur (cible des INSERT ... ON CONFLICT de create_book)
+    __table_args__ = (Index("uq_books_title_author", "title", "author", unique=True), {"sqlite_autoincrement": True})
     
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(200))
     author = Column(String(100))
     url = Column(String(255))
+
+class ChangeClock(Base):
+    """Horloge globale monotone des écritures (une seule ligne, id=1)"""
+    __tablename__ = "change_clock"
+    
+    id = Column(Integer, primary_key=True)
+    value = Column(BigInteger, nullable=False, default=0)
+
+class Tombstone(Base):
+    """Trace des lignes supprimées, pour que /sync propage les suppressions"""
+    __tablename__ = "tombstones"
+    
+    id = Column(Integer, primary_key=True)
+    table_name = Column(String(50), nullable=False)
+    row_id = Column(Integer, nullable=False)
+    version = Column(BigInteger, nullable=False, index=True)
+    deleted_at = Column(DateTime(timezone=True))
+
+class DayPayload(Base):
+    """Réponse JSON finale de /readings/{date}, maintenue à chaque écriture (modèle de lecture)"""
+    __tablename__ = "day_payloads"
+    
+    date = Column(Date, primary_key=True)
+    version = Column(Integer, nullable=False, default=1)
+    body = Column(LargeBinary, nullable=False)
+    body_gzip = Column(LargeBinary, nullable=True)
+
+class SyncOutbox(Base):
+    """Journal des lignes modifiées localement, à répliquer vers Supabase"""
+    __tablename__ = "sync_outbox"
+    # Ids jamais réutilisés après purge: l'ordre des ids reste l'ordre d'écriture
+    __table_args__ = {"sqlite_autoincrement": True}
+    
+    id = Column(Integer, primary_key=True)
+    table_name = Column(String(50), nullable=False)
+    row_id = Column(Integer, nullable=False)
+    operation = Column(String(10), nullable=False)  # upsert ou delete
+
+class SyncState(Base):
+    """Progression de la réplication (plus grand id de l'outbox poussé, indicatif)"""
+    __tablename__ = "sync_state"
+    
+    name = Column(String(50), primary_key=True)
+    last_outbox_id = Column(Integer, nullable=False, default=0)
+
+# Écouteurs de session (versionnement, outbox de réplication): enregistrés dès que
+# les modèles sont chargés, pour l'API comme pour les scripts d'import
+import passages  # noqa: E402,F401
+import versioning  # noqa: E402,F401
+import replication  # noqa: E402,F401
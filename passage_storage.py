@@ -0,0 +1,126 @@
+"""
+Stockage compressé des textes de passages (zstd avec dictionnaire partagé, optionnel).
+
+Le corpus est fait de prose religieuse très répétitive: un dictionnaire zstd entraîné
+sur les passages existants compresse chaque texte bien mieux que zstd seul. Le mode
+est choisi par `PASSAGE_STORAGE`:
+
+- `text` (défaut): `passages.content` contient le texte en UTF-8;
+- `zstd`: les nouveaux textes sont compressés avec le dernier dictionnaire entraîné
+  (`python train_passage_dictionary.py`), ou sans dictionnaire s'il n'y en a pas.
+
+La lecture est transparente dans les deux modes (type `PassageText`): une trame zstd
+est reconnue à son nombre magique et décompressée avec le dictionnaire dont l'id
+figure dans son en-tête. Les dictionnaires sont stockés dans `compression_dictionaries`.
+"""
+import os
+import threading
+from typing import Dict, Optional
+
+from sqlalchemy import LargeBinary, text
+from sqlalchemy.types import TypeDecorator
+
+try:
+    import zstandard  # pyright: ignore[reportMissingImports]
+except ImportError:  # zstd est optionnel: le mode texte suffit
+    zstandard = None
+
+PASSAGE_STORAGE = os.getenv("PASSAGE_STORAGE", "text").lower()
+PASSAGE_ZSTD_LEVEL = int(os.getenv("PASSAGE_ZSTD_LEVEL", "19"))
+
+# Une trame zstd commence par 28 B5 2F FD; un texte UTF-8 ne peut pas commencer par 0x28 0xB5
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+if PASSAGE_STORAGE not in ("text", "zstd"):
+    raise ValueError(f"PASSAGE_STORAGE invalide: {PASSAGE_STORAGE} (text ou zstd)")
+if PASSAGE_STORAGE == "zstd" and zstandard is None:
+    raise RuntimeError("PASSAGE_STORAGE=zstd nécessite le paquet zstandard")
+
+
+class DictionaryRegistry:
+    """Dictionnaires zstd connus, chargés à la demande depuis `compression_dictionaries`.
+
+    Les (dé)compresseurs zstd ne sont pas partagés entre threads: chacun garde les siens.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._dictionaries: Optional[Dict[int, "zstandard.ZstdCompressionDict"]] = None
+        self._local = threading.local()
+
+    def load(self, engine=None) -> None:
+        """(Re)charge les dictionnaires stockés en base."""
+        if engine is None:
+            from database import engine
+        with engine.connect() as connection:
+            rows = connection.execute(text("SELECT id, data FROM compression_dictionaries")).all()
+        dictionaries = {row.id: zstandard.ZstdCompressionDict(bytes(row.data)) for row in rows}
+        with self._lock:
+            self._dictionaries = dictionaries
+            self._local = threading.local()
+
+    def get(self, dict_id: int) -> "zstandard.ZstdCompressionDict":
+        if self._dictionaries is None or dict_id not in self._dictionaries:
+            # Dictionnaire entraîné par un autre processus depuis le dernier chargement
+            self.load()
+        try:
+            return self._dictionaries[dict_id]
+        except KeyError:
+            raise LookupError(f"Dictionnaire zstd {dict_id} introuvable dans compression_dictionaries")
+
+    def latest_id(self) -> int:
+        if self._dictionaries is None:
+            self.load()
+        return max(self._dictionaries, default=0)
+
+    def compressor(self) -> "zstandard.ZstdCompressor":
+        dict_id = self.latest_id()
+        cache = self._local.__dict__.setdefault("compressors", {})
+        if dict_id not in cache:
+            dict_data = self.get(dict_id) if dict_id else None
+            cache[dict_id] = zstandard.ZstdCompressor(level=PASSAGE_ZSTD_LEVEL, dict_data=dict_data, write_content_size=True)
+        return cache[dict_id]
+
+    def decompressor(self, dict_id: int) -> "zstandard.ZstdDecompressor":
+        cache = self._local.__dict__.setdefault("decompressors", {})
+        if dict_id not in cache:
+            dict_data = self.get(dict_id) if dict_id else None
+            cache[dict_id] = zstandard.ZstdDecompressor(dict_data=dict_data)
+        return cache[dict_id]
+
+
+dictionaries = DictionaryRegistry()
+
+
+def encode_passage(content: str) -> bytes:
+    """Forme stockée d'un texte selon PASSAGE_STORAGE."""
+    data = content.encode("utf-8")
+    if PASSAGE_STORAGE == "zstd":
+        return dictionaries.compressor().compress(data)
+    return data
+
+
+def decode_passage(stored) -> str:
+    """Texte d'une valeur stockée (UTF-8 ou trame zstd, avec ou sans dictionnaire)."""
+    if isinstance(stored, str):
+        return stored
+    stored = bytes(stored)
+    if stored[:4] != ZSTD_MAGIC:
+        return stored.decode("utf-8")
+    if zstandard is None:
+        raise RuntimeError("Passage compressé avec zstd: installez le paquet zstandard")
+    dict_id = zstandard.get_frame_parameters(stored).dict_id
+    return dictionaries.decompressor(dict_id).decompress(stored).decode("utf-8")
+
+
+class PassageText(TypeDecorator):
+    """Texte stocké en binaire, compressé ou non, décodé de façon transparente."""
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return encode_passage(value) if value is not None else None
+
+    def process_result_value(self, value, dialect):
+        return decode_passage(value) if value is not None else None
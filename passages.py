@@ -0,0 +1,100 @@
+"""
+Déduplication des textes de lectures par adressage de contenu.
+
+Un même passage revient d'une année à l'autre et entre le matin et le soir: son
+texte est stocké une seule fois dans `passages`, sous son empreinte SHA-256, et
+chaque lecture ne garde que l'empreinte. `Reading.content` reste lisible comme
+une colonne (sous-requête corrélée); l'écrire passe par l'écouteur ci-dessous,
+qui insère le passage s'il est nouveau et renseigne l'empreinte.
+
+De même, `source_book` n'est stocké que s'il diffère de `reference` (NULL sinon).
+"""
+import hashlib
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import Insert, delete, event, exists
+from sqlalchemy.orm import Session, attributes
+
+import models
+from database import dialect_insert
+
+
+def passage_hash(content: str) -> str:
+    """Empreinte SHA-256 (hexadécimale) d'un texte."""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def passages_insert(session: Session, contents: Iterable[Optional[str]]) -> Tuple[Dict[str, str], Optional[Insert]]:
+    """{texte: empreinte} et l'instruction qui insère les textes absents de `passages` (None sans texte).
+
+    L'instruction n'est pas exécutée: l'appelant peut l'envoyer seule ou l'attacher à une
+    autre écriture (CTE sous PostgreSQL).
+    """
+    hashes = {content: passage_hash(content) for content in contents if content is not None}
+    if not hashes:
+        return hashes, None
+    insert = dialect_insert(session)
+    stmt = (
+        insert(models.Passage)
+        .values([{"hash": digest, "content": content} for content, digest in hashes.items()])
+        .on_conflict_do_nothing(index_elements=[models.Passage.hash])
+    )
+    return hashes, stmt
+
+
+def store_passages(session: Session, contents: Iterable[Optional[str]]) -> Dict[str, str]:
+    """Insère les textes absents de `passages` en une requête; retourne {texte: empreinte}."""
+    hashes, stmt = passages_insert(session, contents)
+    if stmt is not None:
+        session.execute(stmt)
+    return hashes
+
+
+def stored_source_book(source_book: Optional[str], reference: Optional[str]) -> Optional[str]:
+    """Valeur de la colonne `source_book`: NULL quand elle ne ferait que répéter la référence."""
+    if source_book is not None and source_book == reference:
+        return None
+    return source_book
+
+
+def purge_orphan_passages(session: Session, hashes: Optional[Iterable[Optional[str]]] = None) -> int:
+    """Supprime les passages qui ne sont plus référencés par aucune lecture.
+
+    Avec `hashes`, seuls ces passages sont examinés (ceux que des lectures viennent de
+    quitter): les écritures groupées purgent ainsi dans leur transaction, par l'index
+    de `readings.passage_hash`, sans parcourir toute la table.
+    """
+    stmt = delete(models.Passage).where(~exists().where(models.Reading._passage_hash == models.Passage.hash))
+    if hashes is not None:
+        candidates = {digest for digest in hashes if digest is not None}
+        if not candidates:
+            return 0
+        stmt = stmt.where(models.Passage.hash.in_(candidates))
+    return session.execute(stmt).rowcount
+
+
+@event.listens_for(Session, "before_flush")
+def _dedupe_passages(session: Session, flush_context, instances) -> None:
+    readings = [obj for obj in session.new if isinstance(obj, models.Reading)]
+    readings += [obj for obj in session.dirty if isinstance(obj, models.Reading)]
+    if not readings:
+        return
+
+    contents = {}
+    for reading in readings:
+        content = attributes.get_history(reading, "content")
+        if content.added:
+            contents[reading] = content.added[-1]
+
+        source_book = attributes.get_history(reading, "source_book")
+        reference = attributes.get_history(reading, "reference")
+        if source_book.added:
+            reading._source_book = stored_source_book(source_book.added[-1], reading.reference)
+        elif reference.deleted and reading._source_book is None:
+            # La source implicite était l'ancienne référence: la conserver explicitement
+            reading._source_book = stored_source_book(reference.deleted[0], reading.reference)
+
+    if contents:
+        hashes = store_passages(session, contents.values())
+        for reading, content in contents.items():
+            reading._passage_hash = hashes.get(content) if content is not None else None
@@ -0,0 +1,81 @@
+"""
+Pré-calcul des réponses de la prochaine période (matin/soir) quelques minutes avant
+chaque changement, pour que le pic de requêtes à la bascule trouve un cache chaud.
+"""
+import asyncio
+import logging
+import os
+import time
+from datetime import date, datetime, timedelta, tzinfo
+from typing import Callable, Optional
+
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+PREWARM_LEAD_SECONDS = float(os.getenv("PREWARM_LEAD_SECONDS", "120"))
+
+# Heures locales de changement de période: 0h -> matin, 13h -> soir
+BOUNDARY_HOURS = (0, 13)
+
+
+def period_for(moment: datetime) -> str:
+    return "matin" if moment.hour < 13 else "soir"
+
+
+def next_boundary(now: datetime) -> datetime:
+    """Prochaine bascule de période strictement après `now` (dans le fuseau de `now`)."""
+    for hour in BOUNDARY_HOURS:
+        boundary = now.replace(hour=hour, minute=0, second=0, microsecond=0)
+        if boundary > now:
+            return boundary
+    tomorrow = now.date() + timedelta(days=1)
+    return datetime(tomorrow.year, tomorrow.month, tomorrow.day, BOUNDARY_HOURS[0], tzinfo=now.tzinfo)
+
+
+class Prewarmer:
+    """Tâche de fond qui appelle `warm(date, période, secondes_avant_bascule)` avant chaque bascule."""
+
+    def __init__(self, warm: Callable[[date, str, float], None], tz: tzinfo, lead: float = PREWARM_LEAD_SECONDS):
+        self.warm = warm
+        self.tz = tz
+        self.lead = lead
+        self._task: Optional[asyncio.Task] = None
+
+    async def warm_next(self) -> datetime:
+        """Pré-calcule la prochaine période et retourne l'heure de sa bascule."""
+        boundary = next_boundary(datetime.now(self.tz))
+        seconds_left = (boundary - datetime.now(self.tz)).total_seconds()
+        start = time.perf_counter()
+        try:
+            await asyncio.to_thread(self.warm, boundary.date(), period_for(boundary), seconds_left)
+        except Exception:
+            metrics.incr("prewarm.errors")
+            logger.exception("Échec du pré-calcul pour %s", boundary.isoformat())
+        else:
+            metrics.incr("prewarm.runs")
+            metrics.set_gauge("prewarm.last_boundary", boundary.isoformat())
+        finally:
+            metrics.observe("prewarm.duration", time.perf_counter() - start)
+        return boundary
+
+    async def run(self) -> None:
+        while True:
+            boundary = next_boundary(datetime.now(self.tz))
+            delay = (boundary - datetime.now(self.tz)).total_seconds() - self.lead
+            if delay > 0:
+                await asyncio.sleep(delay)
+            boundary = await self.warm_next()
+            # Attendre la bascule avant de viser la suivante
+            await asyncio.sleep(max((boundary - datetime.now(self.tz)).total_seconds(), 0) + 1)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
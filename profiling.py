@@ -0,0 +1,143 @@
+"""
+Profilage à la demande d'une requête (échantillonnage statistique des piles).
+
+Une requête est profilée si elle porte l'en-tête `X-Profile` égal à `PROFILE_TOKEN`
+(réservé aux administrateurs; désactivé sans jeton) ou si elle est tirée au sort
+(`PROFILE_SAMPLE_RATE`, 0 par défaut). Un thread échantillonne alors les piles de la
+boucle d'événements et des threads du pool qui exécutent du code de l'application,
+jusqu'à la fin de la requête. Le profil est écrit au format speedscope JSON
+(https://www.speedscope.app) dans `PROFILE_DIR`, dont seuls les `PROFILE_MAX_FILES`
+fichiers les plus récents sont conservés; son id est renvoyé dans `X-Profile-Id`.
+
+Les requêtes non profilées ne paient qu'une comparaison d'en-tête et un tirage.
+Les requêtes concurrentes exécutées pendant un profil y apparaissent aussi (un profil
+par thread): profiler de préférence à faible trafic.
+"""
+import json
+import os
+import random
+import secrets
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN", "")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "./profiles")
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "50"))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "1"))
+
+PROFILE_HEADER = "x-profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+Frame = Tuple[str, str, int]
+
+
+def should_profile(header_value: Optional[str]) -> bool:
+    """Décide si la requête est profilée (en-tête administrateur ou échantillonnage)."""
+    if header_value is not None and PROFILE_TOKEN:
+        # Comparaison sur les octets: compare_digest refuse les str non ASCII (TypeError).
+        # Starlette décode les en-têtes en latin-1, ce qui redonne les octets reçus.
+        try:
+            if secrets.compare_digest(header_value.encode("latin-1"), PROFILE_TOKEN.encode()):
+                return True
+        except UnicodeEncodeError:
+            pass
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+
+class StackSampler:
+    """Échantillonne périodiquement les piles d'appels dans un thread dédié."""
+
+    def __init__(self, loop_thread_id: int, interval_ms: float = PROFILE_INTERVAL_MS):
+        self.loop_thread_id = loop_thread_id
+        self.interval = interval_ms / 1000
+        self.frames: Dict[Frame, int] = {}
+        self.samples: Dict[int, List[Tuple[List[int], float]]] = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self.started_at = 0.0
+        self.elapsed = 0.0
+
+    def start(self) -> None:
+        self.started_at = time.perf_counter()
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.elapsed = time.perf_counter() - self.started_at
+
+    def _stack(self, frame) -> Tuple[List[int], bool]:
+        stack, in_app = [], False
+        while frame is not None:
+            code = frame.f_code
+            key = (getattr(code, "co_qualname", code.co_name), code.co_filename, code.co_firstlineno)
+            index = self.frames.setdefault(key, len(self.frames))
+            stack.append(index)
+            in_app = in_app or (code.co_filename.startswith(APP_DIR) and "site-packages" not in code.co_filename)
+            frame = frame.f_back
+        stack.reverse()
+        return stack, in_app
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            weight, last = (now - last) * 1000, now
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack, in_app = self._stack(frame)
+                # Threads du pool: seulement lorsqu'ils exécutent du code de l'application
+                if thread_id == self.loop_thread_id or in_app:
+                    self.samples.setdefault(thread_id, []).append((stack, weight))
+
+    def to_speedscope(self, name: str) -> dict:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        profiles = []
+        for thread_id, samples in self.samples.items():
+            total = sum(weight for _, weight in samples)
+            profiles.append({
+                "type": "sampled",
+                "name": "boucle d'événements" if thread_id == self.loop_thread_id else names.get(thread_id, str(thread_id)),
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": total,
+                "samples": [stack for stack, _ in samples],
+                "weights": [weight for _, weight in samples],
+            })
+        frames = [{"name": frame_name, "file": file, "line": line} for (frame_name, file, line) in self.frames]
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "api_fast",
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": profiles,
+        }
+
+
+def new_profile_id() -> str:
+    return f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{secrets.token_hex(4)}"
+
+
+def write_profile(profile_id: str, sampler: StackSampler, name: str) -> str:
+    """Écrit le profil dans PROFILE_DIR puis supprime les plus anciens au-delà de PROFILE_MAX_FILES."""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    path = os.path.join(PROFILE_DIR, f"{profile_id}.speedscope.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(sampler.to_speedscope(name), f)
+
+    profiles = sorted(
+        (entry for entry in os.scandir(PROFILE_DIR) if entry.name.endswith(".speedscope.json")),
+        key=lambda entry: entry.stat().st_mtime,
+    )
+    for entry in profiles[:-PROFILE_MAX_FILES] if PROFILE_MAX_FILES > 0 else []:
+        os.remove(entry.path)
+    return path
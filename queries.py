@@ -0,0 +1,79 @@
+"""
+Requêtes de lecture fréquentes, construites une seule fois.
+
+Reconstruire `db.query(...).options(...).filter(...)` à chaque requête coûte la
+construction de la requête ORM et de ses options, avant même la clé du cache de
+compilation de SQLAlchemy. Ici les instructions `select()` sont construites au
+chargement du module (ou une fois par projection `fields`, via `lru_cache`) avec des
+paramètres liés (`bindparam`); les handlers ne font que les exécuter avec leurs
+valeurs. Mesure: `python bench_queries.py`.
+"""
+from functools import lru_cache
+from typing import Optional, Tuple
+
+from sqlalchemy import bindparam, select
+from sqlalchemy.orm import load_only, selectinload
+
+import models
+from fieldsets import load_columns
+
+Fields = Optional[Tuple[str, ...]]
+
+# Projections distinctes gardées en mémoire (une par combinaison de `fields`)
+FIELDS_CACHE_SIZE = 256
+
+
+@lru_cache(maxsize=FIELDS_CACHE_SIZE)
+def day_by_date(fields: Fields = None):
+    """Jour d'une date (`day_date`) avec ses lectures, limitées aux colonnes `fields`."""
+    return (
+        select(models.Day)
+        .options(load_only(models.Day.id), selectinload(models.Day.readings).options(load_columns(models.Reading, fields)))
+        .where(models.Day.date == bindparam("day_date"))
+        .limit(1)
+    )
+
+
+@lru_cache(maxsize=FIELDS_CACHE_SIZE)
+def month_by_name(fields: Fields = None):
+    """Mois d'un nom (`month_name`) avec ses jours et leurs lectures."""
+    return (
+        select(models.Month)
+        .options(
+            load_only(models.Month.id),
+            selectinload(models.Month.days).options(
+                load_only(models.Day.id),
+                selectinload(models.Day.readings).options(load_columns(models.Reading, fields)),
+            ),
+        )
+        .where(models.Month.name == bindparam("month_name"))
+        .limit(1)
+    )
+
+
+# Nom du mois Baha'i de numéro `number`
+month_name_by_number = select(models.Month.name).where(models.Month.number == bindparam("number"))
+
+# Tous les mois (calendrier d'une année)
+all_months = select(models.Month)
+
+# Mois réduits aux colonnes du paquet hors ligne
+month_labels = select(models.Month).options(load_only(models.Month.number, models.Month.name, models.Month.translation))
+
+# Jours entre `start` et `end` (inclus) avec leurs lectures
+days_between = (
+    select(models.Day)
+    .options(load_only(models.Day.id, models.Day.date, models.Day.title, models.Day.special_event), selectinload(models.Day.readings))
+    .where(models.Day.date >= bindparam("start"), models.Day.date <= bindparam("end"))
+)
+
+# Événements spéciaux (date, nom) par date: même prédicat que l'index partiel ix_days_special_events,
+# qui couvre les deux colonnes (lecture de l'index seul)
+special_events = (
+    select(models.Day.date, models.Day.special_event)
+    .where(models.Day.special_event.isnot(None))
+    .order_by(models.Day.date)
+)
+
+# Événements spéciaux entre `start` et `end` (inclus)
+special_events_between = special_events.where(models.Day.date >= bindparam("start"), models.Day.date <= bindparam("end"))
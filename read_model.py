@@ -0,0 +1,108 @@
+"""
+Modèle de lecture dénormalisé: la réponse finale de /readings/{date} est stockée par
+date dans `day_payloads` et réécrite dans la transaction de chaque écriture.
+"""
+import os
+from datetime import date
+from typing import Iterable, List, Optional
+
+from sqlalchemy.orm import Session, selectinload
+
+import models
+import schemas
+from cache import CachedPayload
+from compression import MINIMUM_SIZE, SUPPORTED_ENCODINGS, compress
+from database import dialect_insert
+
+# Stocker aussi la variante gzip (servie telle quelle aux clients qui l'acceptent)
+DAY_PAYLOAD_STORE_GZIP = os.getenv("DAY_PAYLOAD_STORE_GZIP", "1").lower() in ("1", "true", "yes")
+
+
+def day_readings_body(readings: List[models.Reading]) -> bytes:
+    """Corps JSON de /readings/{date} pour les lectures d'un jour."""
+    return schemas.APIResponse[List[schemas.Reading]](data=readings).model_dump_json().encode()
+
+
+def _gzip(body: bytes) -> Optional[bytes]:
+    return compress(body, "gzip") if DAY_PAYLOAD_STORE_GZIP and len(body) >= MINIMUM_SIZE else None
+
+
+def day_dates(db: Session, day_ids: Iterable[Optional[int]]) -> List[date]:
+    """Dates des jours donnés par id (pour les écritures qui ne connaissent que day_id)."""
+    ids = {day_id for day_id in day_ids if day_id is not None}
+    if not ids:
+        return []
+    return [row.date for row in db.query(models.Day.date).filter(models.Day.id.in_(ids))]
+
+
+def upsert_day_payload(db: Session, day_date: date, readings: List[models.Reading]) -> None:
+    """Écrit le payload d'une date dont on connaît déjà les lectures, en une seule requête."""
+    body = day_readings_body(readings)
+    insert = dialect_insert(db)
+    stmt = insert(models.DayPayload).values(date=day_date, version=1, body=body, body_gzip=_gzip(body))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[models.DayPayload.date],
+        set_={
+            "version": models.DayPayload.version + 1,
+            "body": stmt.excluded.body,
+            "body_gzip": stmt.excluded.body_gzip,
+        },
+    )
+    db.execute(stmt)
+
+
+def refresh_day_payloads(db: Session, dates: Iterable[Optional[date]]) -> None:
+    """Recalcule les payloads des dates touchées, dans la transaction courante.
+
+    Les modifications en attente sont flushées d'abord pour que les lectures
+    relues reflètent l'écriture en cours. Une date sans jour perd son payload.
+    """
+    dates = {day_date for day_date in dates if day_date is not None}
+    if not dates:
+        return
+    db.flush()
+    days = {
+        day.date: day
+        for day in db.query(models.Day)
+        .options(selectinload(models.Day.readings))
+        .populate_existing()
+        .filter(models.Day.date.in_(dates))
+    }
+    stored = {
+        payload.date: payload
+        for payload in db.query(models.DayPayload).filter(models.DayPayload.date.in_(dates))
+    }
+    for day_date in dates:
+        day = days.get(day_date)
+        payload = stored.get(day_date)
+        if day is None:
+            if payload is not None:
+                db.delete(payload)
+            continue
+        body = day_readings_body(day.readings)
+        body_gzip = _gzip(body)
+        if payload is None:
+            db.add(models.DayPayload(date=day_date, version=1, body=body, body_gzip=body_gzip))
+        elif payload.body != body:
+            payload.version += 1
+            payload.body = body
+            payload.body_gzip = body_gzip
+
+
+def load_day_payload(db: Session, day_date: date) -> Optional[CachedPayload]:
+    """Lecture par clé primaire: octets prêts à l'envoi, sans recompression gzip.
+
+    Les variantes non stockées (br) sont calculées ici, une fois par mise en cache,
+    plutôt qu'à chaque réponse par le middleware de compression.
+    """
+    payload = db.get(models.DayPayload, day_date)
+    if payload is None:
+        return None
+    cached = CachedPayload.build(payload.body, compress=False)
+    if payload.body_gzip:
+        cached.encoded["gzip"] = payload.body_gzip
+    if len(payload.body) >= MINIMUM_SIZE:
+        for encoding in SUPPORTED_ENCODINGS:
+            if encoding not in cached.encoded:
+                cached.encoded[encoding] = compress(payload.body, encoding)
+    return cached
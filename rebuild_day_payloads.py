@@ -0,0 +1,36 @@
+"""
+Script pour reconstruire toute la table day_payloads à partir des jours et lectures
+(et supprimer les passages qui ne sont plus référencés)
+"""
+from database import SessionLocal, engine
+import models
+from passages import purge_orphan_passages
+from read_model import refresh_day_payloads
+
+BATCH_SIZE = 200
+
+def rebuild_day_payloads():
+    db = SessionLocal()
+    try:
+        dates = [row.date for row in db.query(models.Day.date).filter(models.Day.date.isnot(None)).order_by(models.Day.date)]
+        # Payloads de dates qui n'ont plus de jour
+        orphans = db.query(models.DayPayload).filter(~models.DayPayload.date.in_(db.query(models.Day.date).filter(models.Day.date.isnot(None))))
+        removed = orphans.delete(synchronize_session=False)
+        
+        for start in range(0, len(dates), BATCH_SIZE):
+            refresh_day_payloads(db, dates[start:start + BATCH_SIZE])
+            db.commit()
+        
+        purged = purge_orphan_passages(db)
+        db.commit()
+        
+        print(f"[SUCCESS] {len(dates)} payloads reconstruits, {removed} supprimés, {purged} passages orphelins supprimés.")
+    except Exception as e:
+        print(f"[ERROR] Erreur lors de la reconstruction: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    models.Base.metadata.create_all(bind=engine)
+    rebuild_day_payloads()
@@ -0,0 +1,185 @@
+"""
+Réplication en arrière-plan de la base locale vers Supabase.
+
+Les événements de session SQLAlchemy alimentent la table `sync_outbox` dans la
+même transaction que l'écriture; un worker asynchrone la lit par lots, pousse
+des upserts/suppressions groupés vers l'API REST puis supprime exactement les
+entrées poussées.
+
+L'outbox est lue depuis sa tête (plus petits ids restants), jamais à partir d'un
+high-water mark: sous PostgreSQL, les ids de séquence peuvent être validés dans le
+désordre, et une entrée d'id inférieur validée après la lecture d'un lot doit être
+lue au lot suivant au lieu d'être sautée puis purgée. `sync_state` ne garde que le
+plus grand id poussé, à titre indicatif.
+"""
+import asyncio
+import logging
+import os
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, event, insert, select
+from sqlalchemy.orm import Session
+
+import models
+from database import SessionLocal
+from supabase_client import SupabaseClient, SupabaseError
+from versioning import row_columns
+
+logger = logging.getLogger(__name__)
+
+SYNC_ENABLED = os.getenv("SUPABASE_SYNC_ENABLED", "").lower() in ("1", "true", "yes")
+SYNC_BATCH_SIZE = int(os.getenv("SUPABASE_SYNC_BATCH_SIZE", "500"))
+SYNC_INTERVAL = float(os.getenv("SUPABASE_SYNC_INTERVAL", "5"))
+SYNC_MAX_BACKOFF = float(os.getenv("SUPABASE_SYNC_MAX_BACKOFF", "300"))
+
+# Tables répliquées, dans l'ordre des clés étrangères (parents d'abord).
+# Les mois sont inclus pour que les jours répliqués référencent une ligne existante.
+SYNCED_MODELS = (models.Month, models.Book, models.Day, models.Reading)
+SYNCED_TABLES = {model.__tablename__: model for model in SYNCED_MODELS}
+
+STATE_NAME = "supabase"
+
+
+def record_changes(session: Session, table_name: str, row_ids: Iterable[int], operation: str = "upsert") -> None:
+    """Ajoute des lignes à l'outbox pour les écritures faites hors de l'ORM (INSERT/UPDATE en masse)."""
+    if not SYNC_ENABLED:
+        return
+    rows = [{"table_name": table_name, "row_id": row_id, "operation": operation} for row_id in row_ids]
+    if rows:
+        session.execute(insert(models.SyncOutbox), rows)
+
+
+@event.listens_for(Session, "after_flush")
+def _populate_outbox(session: Session, flush_context) -> None:
+    if not SYNC_ENABLED:
+        return
+    # En after_flush, new/dirty/deleted reflètent encore l'état d'avant le flush
+    changes = [(obj, "upsert") for obj in session.new]
+    changes += [(obj, "upsert") for obj in session.dirty if session.is_modified(obj)]
+    changes += [(obj, "delete") for obj in session.deleted]
+    rows = [
+        {"table_name": obj.__tablename__, "row_id": obj.id, "operation": operation}
+        for obj, operation in changes
+        if isinstance(obj, SYNCED_MODELS)
+    ]
+    if rows:
+        session.connection().execute(insert(models.SyncOutbox.__table__), rows)
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def fetch_batch(limit: int = SYNC_BATCH_SIZE) -> Tuple[List[int], Dict[str, Dict[str, List]]]:
+    """Lit les plus anciennes entrées de l'outbox.
+
+    Retourne (ids des entrées lues, {table: {"upsert": [lignes], "delete": [ids]}}).
+    Pour une même ligne, seule la dernière opération du lot est retenue; les upserts
+    relisent l'état courant des lignes, si bien qu'une entrée validée en retard ne
+    réécrit pas une version plus ancienne.
+    """
+    db = SessionLocal()
+    try:
+        entries = db.execute(
+            select(models.SyncOutbox.id, models.SyncOutbox.table_name, models.SyncOutbox.row_id, models.SyncOutbox.operation)
+            .order_by(models.SyncOutbox.id)
+            .limit(limit)
+        ).all()
+        if not entries:
+            return [], {}
+
+        latest: Dict[str, Dict[int, str]] = {}
+        for _, table_name, row_id, operation in entries:
+            latest.setdefault(table_name, {})[row_id] = operation
+
+        batch: Dict[str, Dict[str, List]] = {}
+        for table_name, operations in latest.items():
+            model = SYNCED_TABLES.get(table_name)
+            if model is None:
+                continue
+            upsert_ids = [row_id for row_id, operation in operations.items() if operation == "upsert"]
+            delete_ids = [row_id for row_id, operation in operations.items() if operation == "delete"]
+            rows = []
+            if upsert_ids:
+                result = db.execute(select(*row_columns(model)).where(model.id.in_(upsert_ids)))
+                rows = [{key: _jsonable(value) for key, value in row.items()} for row in result.mappings()]
+            batch[table_name] = {"upsert": rows, "delete": delete_ids}
+        return [entry[0] for entry in entries], batch
+    finally:
+        db.close()
+
+
+def mark_replicated(entry_ids: List[int]) -> None:
+    """Supprime de l'outbox exactement les entrées poussées (jamais une plage d'ids)."""
+    db = SessionLocal()
+    try:
+        db.execute(delete(models.SyncOutbox).where(models.SyncOutbox.id.in_(entry_ids)))
+        state = db.get(models.SyncState, STATE_NAME)
+        if state is None:
+            db.add(models.SyncState(name=STATE_NAME, last_outbox_id=max(entry_ids)))
+        else:
+            state.last_outbox_id = max(state.last_outbox_id, *entry_ids)
+        db.commit()
+    finally:
+        db.close()
+
+
+async def push_batch(client: SupabaseClient, batch: Dict[str, Dict[str, List]]) -> None:
+    """Pousse un lot: upserts parents d'abord, suppressions enfants d'abord."""
+    for model in SYNCED_MODELS:
+        changes = batch.get(model.__tablename__)
+        if changes and changes["upsert"]:
+            await client.upsert(model.__tablename__, changes["upsert"])
+    for model in reversed(SYNCED_MODELS):
+        changes = batch.get(model.__tablename__)
+        if changes and changes["delete"]:
+            await client.delete(model.__tablename__, "id", changes["delete"])
+
+
+class ReplicationWorker:
+    """Boucle de réplication; les accès à la base locale tournent dans un thread."""
+
+    def __init__(self, client: SupabaseClient, interval: float = SYNC_INTERVAL, max_backoff: float = SYNC_MAX_BACKOFF):
+        self.client = client
+        self.interval = interval
+        self.max_backoff = max_backoff
+        self._task: Optional[asyncio.Task] = None
+
+    async def sync_once(self) -> int:
+        """Réplique un lot; retourne le nombre d'entrées de l'outbox consommées (0 si elle est vide)."""
+        entry_ids, batch = await asyncio.to_thread(fetch_batch)
+        if batch:
+            await push_batch(self.client, batch)
+        if entry_ids:
+            await asyncio.to_thread(mark_replicated, entry_ids)
+        return len(entry_ids)
+
+    async def run(self) -> None:
+        backoff = self.interval
+        while True:
+            try:
+                if await self.sync_once():
+                    backoff = self.interval
+                    continue  # Outbox potentiellement non vidée: enchaîner sans attendre
+                backoff = self.interval
+            except SupabaseError as e:
+                backoff = min(backoff * 2, self.max_backoff)
+                logger.warning("Réplication Supabase échouée, nouvel essai dans %.0fs: %s", backoff, e)
+            except Exception:
+                backoff = min(backoff * 2, self.max_backoff)
+                logger.exception("Erreur inattendue de réplication, nouvel essai dans %.0fs", backoff)
+            await asyncio.sleep(backoff)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
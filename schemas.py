@@ -1,5 +1,6 @@
-from pydantic import BaseModel
-from typing import List, Optional, TypeVar, Generic
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional, TypeVar, Generic
+import datetime
 from datetime import date
 
 # ===================================================================
@@ -65,7 +66,8 @@ class DayCreate(DayBase):
     month_id: int
 
 class DayUpdate(BaseModel):
-    date: Optional[date] = None
+    # datetime.date: le champ `date` masque le type dans le corps de la classe
+    date: Optional[datetime.date] = None
     special_event: Optional[str] = None
     month_id: Optional[int] = None
 
@@ -113,6 +115,39 @@ class MonthlyReadingsResponse(BaseModel):
     count: int
     readings: List[Reading]
 
+# Nombre maximal de dates par appel à POST /readings/batch
+MAX_BATCH_DATES = 5000
+
+class ReadingsBatchRequest(BaseModel):
+    dates: List[date] = Field(..., min_length=1, max_length=MAX_BATCH_DATES)
+
+# Lectures par date ISO; null si la date n'existe pas
+ReadingsBatchResponse = Dict[str, Optional[List[Reading]]]
+
+# Nombre maximal de lignes par appel à PATCH /readings et PATCH /days
+MAX_BULK_ROWS = 5000
+
+class ReadingPatch(ReadingUpdate):
+    id: int
+    day_id: Optional[int] = None
+
+class ReadingsBulkUpdate(BaseModel):
+    updates: List[ReadingPatch] = Field(..., min_length=1, max_length=MAX_BULK_ROWS)
+
+class DayPatch(DayUpdate):
+    id: int
+
+class DaysBulkUpdate(BaseModel):
+    updates: List[DayPatch] = Field(..., min_length=1, max_length=MAX_BULK_ROWS)
+
+class BulkUpdateResult(BaseModel):
+    updated: int
+    missing_ids: List[int] = []
+
+class BulkDeleteResult(BaseModel):
+    # Lignes supprimées par table (ex: {"days": 3, "readings": 6})
+    deleted: Dict[str, int]
+
 T = TypeVar('T')
 
 class APIResponse(BaseModel, Generic[T]):
@@ -136,15 +171,3 @@ class DailyReadingsCreate(BaseModel):
         allow_unicode = True
         # Validation personnalisée pour les caractères spéciaux
         validate_assignment = True
-
-    def __init__(self, **data):
-        # Conversion automatique de la date string vers date object si nécessaire
-        if 'date' in data and isinstance(data['date'], str):
-            try:
-                from datetime import datetime
-                data['date'] = datetime.strptime(data['date'], '%Y-%m-%d').date()
-            except ValueError:
-                # Si la conversion échoue, garder la string
-                pass
-        super().__init__(**data)
-
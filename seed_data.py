@@ -1,40 +1,47 @@
-from database import SessionLocal, engine
+from database import SessionLocal, dialect_insert, engine
 import models
-from datetime import date
+from replication import record_changes
+from versioning import next_version, stamp
+from datetime import date, timedelta
+from sqlalchemy.orm import Session
 
 def seed_months():
+    """Insère les 19 mois absents (un seul INSERT ... ON CONFLICT DO NOTHING sur le numéro)."""
     db = SessionLocal()
     try:
-        if db.query(models.Month).count() == 0:
-            print("Seeding Baha'i months...")
-            bahai_months = [
-                (1, "Bahá", "Splendeur"), 
-                (2, "Jalál", "Gloire"), 
-                (3, "Jamál", "Beauté"),
-                (4, "‘Aẓamat", "Grandeur"), 
-                (5, "Núr", "Lumière"), 
-                (6, "Raḥmat", "Miséricorde"),
-                (7, "Kalimát", "Paroles"), 
-                (8, "Kamál", "Perfection"), 
-                (9, "Asmá’", "Noms"),
-                (10, "‘Izzat", "Puissance"), 
-                (11, "Mashíyyat", "Volonté"),
-                 (12, "‘Ilm", "Savoir"),
-                (13, "Qudrat", "Pouvoir"), 
-                (14, "Qawl", "Parole"), 
-                (15, "Masá’il", "Questions"),
-                (16, "Sharaf", "Honneur"), 
-                (17, "Sulṭán", "Souveraineté"), 
-                (18, "Mulk", "Empire"),
-                (19, "‘Alá’", "Élévation")
-            ]
-            for number, name, translation in bahai_months:
-                month = models.Month(name=name, translation=translation, number=number)
-                db.add(month)
-            db.commit()
-            print(f"{len(bahai_months)} months seeded successfully.")
-        else:
-            print("Months table is not empty. Seeding skipped.")
+        print("Seeding Baha'i months...")
+        bahai_months = [
+            (1, "Bahá", "Splendeur"), 
+            (2, "Jalál", "Gloire"), 
+            (3, "Jamál", "Beauté"),
+            (4, "‘Aẓamat", "Grandeur"), 
+            (5, "Núr", "Lumière"), 
+            (6, "Raḥmat", "Miséricorde"),
+            (7, "Kalimát", "Paroles"), 
+            (8, "Kamál", "Perfection"), 
+            (9, "Asmá’", "Noms"),
+            (10, "‘Izzat", "Puissance"), 
+            (11, "Mashíyyat", "Volonté"),
+             (12, "‘Ilm", "Savoir"),
+            (13, "Qudrat", "Pouvoir"), 
+            (14, "Qawl", "Parole"), 
+            (15, "Masá’il", "Questions"),
+            (16, "Sharaf", "Honneur"), 
+            (17, "Sulṭán", "Souveraineté"), 
+            (18, "Mulk", "Empire"),
+            (19, "‘Alá’", "Élévation")
+        ]
+        insert = dialect_insert(db)
+        version_stamp = stamp(next_version(db))
+        inserted = db.scalars(
+            insert(models.Month)
+            .values([dict(number=number, name=name, translation=translation, **version_stamp) for number, name, translation in bahai_months])
+            .on_conflict_do_nothing(index_elements=[models.Month.number])
+            .returning(models.Month.id)
+        ).all()
+        record_changes(db, "months", inserted)
+        db.commit()
+        print(f"{len(inserted)} months seeded successfully ({len(bahai_months) - len(inserted)} already present).")
     except Exception as e:
         print(f"Error seeding months: {e}")
         db.rollback()
@@ -42,27 +49,33 @@ def seed_months():
         db.close()
 
 def seed_books():
+    """Insère les livres absents (un seul INSERT ... ON CONFLICT DO NOTHING sur titre et auteur)."""
     db = SessionLocal()
     try:
-        if db.query(models.Book).count() == 0:
-            print("Seeding books...")
-            books = [
-                models.Book(
-                    title="Les Paroles cachées",
-                    author="Baha'u'llah",
-                    url="https://www.bahai.org/fr/library/authoritative-texts/bahaullah/hidden-words/"
-                ),
-                models.Book(
-                    title="Dieu passe près de nous",
-                    author="Shoghi Effendi",
-                    url="https://www.bahai.org/fr/library/authoritative-texts/shoghi-effendi/god-passes-by/"
-                )
-            ]
-            db.add_all(books)
-            db.commit()
-            print(f"{len(books)} books seeded successfully.")
-        else:
-            print("Books table is not empty. Seeding skipped.")
+        print("Seeding books...")
+        books = [
+            dict(
+                title="Les Paroles cachées",
+                author="Baha'u'llah",
+                url="https://www.bahai.org/fr/library/authoritative-texts/bahaullah/hidden-words/"
+            ),
+            dict(
+                title="Dieu passe près de nous",
+                author="Shoghi Effendi",
+                url="https://www.bahai.org/fr/library/authoritative-texts/shoghi-effendi/god-passes-by/"
+            )
+        ]
+        insert = dialect_insert(db)
+        version_stamp = stamp(next_version(db))
+        inserted = db.scalars(
+            insert(models.Book)
+            .values([dict(book, **version_stamp) for book in books])
+            .on_conflict_do_nothing(index_elements=[models.Book.title, models.Book.author])
+            .returning(models.Book.id)
+        ).all()
+        record_changes(db, "books", inserted)
+        db.commit()
+        print(f"{len(inserted)} books seeded successfully ({len(books) - len(inserted)} already present).")
     except Exception as e:
         print(f"Error seeding books: {e}")
         db.rollback()
@@ -115,13 +128,39 @@ def gregorian_to_bahai_date(gregorian_date: date) -> tuple:
     
     return bahai_day, bahai_month, bahai_year
 
-def get_day_info_from_gregorian(gregorian_date: date = None) -> str:
+def bahai_year_start(bahai_year: int) -> date:
+    """
+    Retourne la date grégorienne du premier jour (Naw-Rúz) d'une année Baha'i.
+    Cohérent avec gregorian_to_bahai_date: années de 365 jours, 182 commence le 21 mars 2025.
+    """
+    return date(2025, 3, 21) + timedelta(days=(bahai_year - 182) * 365)
+
+def get_bahai_year_layout(bahai_year: int) -> dict:
+    """
+    Découpage d'une année Baha'i en dates grégoriennes: 18 mois de 19 jours,
+    les 4 jours intercalaires (Ayyám-i-Há), puis le 19ème mois ('Alá').
+    
+    Returns:
+        dict: {"start", "end", "months": [(numéro, début, fin)], "ayyam_i_ha": (début, fin)}
+    """
+    start = bahai_year_start(bahai_year)
+    months = [
+        (number, start + timedelta(days=(number - 1) * 19), start + timedelta(days=number * 19 - 1))
+        for number in range(1, 19)
+    ]
+    ayyam_i_ha = (start + timedelta(days=19 * 18), start + timedelta(days=19 * 18 + 3))
+    months.append((19, start + timedelta(days=19 * 18 + 4), start + timedelta(days=364)))
+    return {"start": start, "end": start + timedelta(days=364), "months": months, "ayyam_i_ha": ayyam_i_ha}
+
+def get_day_info_from_gregorian(gregorian_date: date = None, db: Session = None) -> str:
     """
     Retourne les informations d'un jour spécifique au format:
     "26 SEPTEMBRE - 8 'Izzat (Puissance - 10ème mois)"
     
     Args:
         gregorian_date: Date grégorienne (si None, utilise la date du jour)
+        db: Session à utiliser; ses erreurs sont propagées (sans session, une session
+            est ouverte et une erreur est retournée sous forme de texte)
     
     Returns:
         str: Information formatée du jour
@@ -129,43 +168,57 @@ def get_day_info_from_gregorian(gregorian_date: date = None) -> str:
     if gregorian_date is None:
         gregorian_date = date.today()
     
-    db = SessionLocal()
-    try:
-        # Convertir la date grégorienne en date Baha'i
-        bahai_day, bahai_month_number, bahai_year = gregorian_to_bahai_date(gregorian_date)
-        
-        # Récupérer le mois Baha'i
-        month = db.query(models.Month).filter(models.Month.number == bahai_month_number).first()
-        
-        if not month:
-            return f"Mois Baha'i {bahai_month_number} non trouvé"
-        
-        # Noms des mois grégoriens en français (abrégés)
-        gregorian_months = [
-            "JAN", "FÉV", "MAR", "AVR", "MAI", "JUN",
-            "JUL", "AOU", "SEP", "OCT", "NOV", "DÉC"
-        ]
-        
-        gregorian_month_name = gregorian_months[gregorian_date.month - 1]
-        
-        # Formatage selon l'exemple: "26 SEP - 1 Asmá' (Noms - 9ème mois)"
-        ordinal_suffix = "er" if bahai_month_number == 1 else "ème"
-        
-        base_info = f"{gregorian_date.day} {gregorian_month_name} - {bahai_day} {month.name} ({month.translation} - {bahai_month_number}{ordinal_suffix} mois)"
-        
-        return base_info
-        
-    except Exception as e:
-        return f"Erreur: {e}"
-    finally:
-        db.close()
+    if db is None:
+        db = SessionLocal()
+        try:
+            return get_day_info_from_gregorian(gregorian_date, db)
+        except Exception as e:
+            return f"Erreur: {e}"
+        finally:
+            db.close()
+    
+    # Convertir la date grégorienne en date Baha'i
+    bahai_day, bahai_month_number, bahai_year = gregorian_to_bahai_date(gregorian_date)
+    
+    # Récupérer le mois Baha'i
+    month = db.query(models.Month).filter(models.Month.number == bahai_month_number).first()
+    
+    if not month:
+        return f"Mois Baha'i {bahai_month_number} non trouvé"
+    
+    # Noms des mois grégoriens en français (abrégés)
+    gregorian_months = [
+        "JAN", "FÉV", "MAR", "AVR", "MAI", "JUN",
+        "JUL", "AOU", "SEP", "OCT", "NOV", "DÉC"
+    ]
+    
+    gregorian_month_name = gregorian_months[gregorian_date.month - 1]
+    
+    # Formatage selon l'exemple: "26 SEP - 1 Asmá' (Noms - 9ème mois)"
+    ordinal_suffix = "er" if bahai_month_number == 1 else "ème"
+    
+    return f"{gregorian_date.day} {gregorian_month_name} - {bahai_day} {month.name} ({month.translation} - {bahai_month_number}{ordinal_suffix} mois)"
+
+def month_feast(month, month_number: int) -> dict:
+    """Fête du 1er jour du mois `month_number`, à partir de la ligne `month` déjà chargée (ou None)."""
+    if month is None:
+        return {"is_feast": False}
+    return {
+        "is_feast": True,
+        "feast_name": f"Fête de {month.name}",
+        "month_name": month.name,
+        "month_translation": month.translation,
+        "month_number": month_number
+    }
 
-def get_feast_info(gregorian_date: date = None) -> dict:
+def get_feast_info(gregorian_date: date = None, db: Session = None) -> dict:
     """
     Retourne les informations de fête si c'est un jour de fête (1er jour du mois Baha'i).
     
     Args:
         gregorian_date: Date grégorienne (si None, utilise la date du jour)
+        db: Session à utiliser; ses erreurs sont propagées (sans session, une session
+            est ouverte et une erreur est retournée dans le dictionnaire)
     
     Returns:
         dict: Information sur la fête ou None
@@ -173,27 +226,22 @@ def get_feast_info(gregorian_date: date = None) -> dict:
     if gregorian_date is None:
         gregorian_date = date.today()
     
-    db = SessionLocal()
-    try:
-        bahai_day, bahai_month_number, bahai_year = gregorian_to_bahai_date(gregorian_date)
-        
-        if bahai_day == 1:  # Premier jour du mois = fête
-            month = db.query(models.Month).filter(models.Month.number == bahai_month_number).first()
-            if month:
-                return {
-                    "is_feast": True,
-                    "feast_name": f"Fête de {month.name}",
-                    "month_name": month.name,
-                    "month_translation": month.translation,
-                    "month_number": bahai_month_number
-                }
-        
-        return {"is_feast": False}
-        
-    except Exception as e:
-        return {"is_feast": False, "error": str(e)}
-    finally:
-        db.close()
+    if db is None:
+        db = SessionLocal()
+        try:
+            return get_feast_info(gregorian_date, db)
+        except Exception as e:
+            return {"is_feast": False, "error": str(e)}
+        finally:
+            db.close()
+    
+    bahai_day, bahai_month_number, bahai_year = gregorian_to_bahai_date(gregorian_date)
+    
+    if bahai_day == 1:  # Premier jour du mois = fête
+        month = db.query(models.Month).filter(models.Month.number == bahai_month_number).first()
+        return month_feast(month, bahai_month_number)
+    
+    return {"is_feast": False}
 
 def get_today_bahai_info() -> str:
     """
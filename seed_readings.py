@@ -1,5 +1,6 @@
 from database import SessionLocal
 import models
+from read_model import refresh_day_payloads
 from datetime import date
 import json
 import glob
@@ -65,6 +66,7 @@ def load_readings_from_json():
                 )
                 
                 db.add_all([morning, evening])
+                refresh_day_payloads(db, [reading_date])
                 db.commit()
                 print(f"[SUCCESS] {data['date']} ajoute avec succes.")
                 
@@ -0,0 +1,94 @@
+"""
+Coalescence des calculs concurrents (« single-flight »): pour une même clé, un seul
+appelant calcule, les autres attendent son résultat.
+
+Utilisable depuis les handlers synchrones (threadpool) comme asynchrones; un appel
+en cours est partagé entre les deux mondes.
+"""
+import asyncio
+import threading
+from typing import Any, Callable, Dict, Hashable, List, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+        self.waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+
+def _resolve(future: asyncio.Future, call: _Call) -> None:
+    if future.done():
+        return
+    if call.error is not None:
+        future.set_exception(call.error)
+    else:
+        future.set_result(call.result)
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def _join(self, key: Hashable) -> Tuple[_Call, bool]:
+        """Retourne l'appel en cours pour la clé et indique si l'appelant en est le leader."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                return call, False
+            call = self._calls[key] = _Call()
+            return call, True
+
+    def _finish(self, key: Hashable, call: _Call) -> None:
+        with self._lock:
+            self._calls.pop(key, None)
+            call.done.set()
+            waiters, call.waiters = call.waiters, []
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_resolve, future, call)
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Version bloquante, pour le code exécuté dans un thread."""
+        call, leader = self._join(key)
+        if leader:
+            try:
+                call.result = fn()
+            except BaseException as e:
+                call.error = e
+            finally:
+                self._finish(key, call)
+        else:
+            call.done.wait()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Version asynchrone; `fn` synchrone est exécutée dans le threadpool."""
+        call, leader = self._join(key)
+        if leader:
+            try:
+                if asyncio.iscoroutinefunction(fn):
+                    call.result = await fn()
+                else:
+                    call.result = await run_in_threadpool(fn)
+            except BaseException as e:
+                call.error = e
+            finally:
+                self._finish(key, call)
+        else:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            with self._lock:
+                if call.done.is_set():
+                    _resolve(future, call)
+                else:
+                    call.waiters.append((loop, future))
+            await asyncio.shield(future)
+        if call.error is not None:
+            raise call.error
+        return call.result
@@ -11,4 +11,5 @@ python seed_readings.py
 
 # Démarrer le serveur uvicorn
 echo "Starting server..."
-uvicorn main:app --host 0.0.0.0 --port ${PORT:-8000}
+# Journal d'accès JSON fourni par l'application (access_log.py): celui d'uvicorn est désactivé
+uvicorn main:app --host 0.0.0.0 --port ${PORT:-8000} --no-access-log
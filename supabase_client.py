@@ -0,0 +1,141 @@
+"""
+Client Supabase (PostgREST) asynchrone: pool de connexions HTTP, timeouts, retries
+et mise en cache du statut de santé.
+"""
+import asyncio
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx  # pyright: ignore[reportMissingImports]
+
+SUPABASE_TIMEOUT = float(os.getenv("SUPABASE_TIMEOUT", "5"))
+SUPABASE_RETRIES = int(os.getenv("SUPABASE_RETRIES", "2"))
+SUPABASE_MAX_CONNECTIONS = int(os.getenv("SUPABASE_MAX_CONNECTIONS", "10"))
+SUPABASE_HEALTH_TTL = float(os.getenv("SUPABASE_HEALTH_TTL", "30"))
+
+# Statuts transitoires pour lesquels une nouvelle tentative a du sens
+RETRYABLE_STATUS = {502, 503, 504}
+
+
+class SupabaseError(Exception):
+    """Erreur renvoyée par l'API REST Supabase (ou réseau après épuisement des retries)."""
+
+
+class SupabaseClient:
+    """Accès minimal à l'API REST (PostgREST) de Supabase via un `httpx.AsyncClient` partagé."""
+
+    def __init__(
+        self,
+        url: str,
+        key: str,
+        timeout: float = SUPABASE_TIMEOUT,
+        retries: int = SUPABASE_RETRIES,
+        max_connections: int = SUPABASE_MAX_CONNECTIONS,
+        health_ttl: float = SUPABASE_HEALTH_TTL,
+        health_table: str = "test_data",
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.retries = retries
+        self.health_ttl = health_ttl
+        self.health_table = health_table
+        self._client = httpx.AsyncClient(
+            base_url=url.rstrip("/") + "/rest/v1",
+            headers={"apikey": key, "Authorization": f"Bearer {key}"},
+            timeout=httpx.Timeout(timeout),
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            transport=transport,
+        )
+        self._health: Optional[Dict[str, str]] = None
+        self._health_checked_at = 0.0
+        self._health_lock = asyncio.Lock()
+
+    async def request(
+        self,
+        method: str,
+        table: str,
+        *,
+        params: Optional[Dict[str, str]] = None,
+        json: Any = None,
+        headers: Optional[Dict[str, str]] = None,
+        idempotent: bool = True,
+    ) -> httpx.Response:
+        """Exécute une requête avec backoff exponentiel.
+
+        Les requêtes non idempotentes (insert) ne sont rejouées que si la connexion
+        n'a pas pu être établie, pour éviter les doublons.
+        """
+        for attempt in range(self.retries + 1):
+            last_attempt = attempt == self.retries
+            try:
+                response = await self._client.request(method, f"/{table}", params=params, json=json, headers=headers)
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout) as e:
+                if last_attempt:
+                    raise SupabaseError(f"Connexion impossible: {e}") from e
+            except httpx.TransportError as e:
+                if last_attempt or not idempotent:
+                    raise SupabaseError(f"Erreur réseau: {e}") from e
+            else:
+                if response.status_code in RETRYABLE_STATUS and idempotent and not last_attempt:
+                    pass
+                elif response.is_error:
+                    raise SupabaseError(f"{response.status_code}: {response.text}")
+                else:
+                    return response
+            await asyncio.sleep(0.1 * 2 ** attempt)
+        raise SupabaseError("Nombre maximal de tentatives atteint")
+
+    async def select(self, table: str, columns: str = "*", limit: Optional[int] = None, **filters: str) -> List[Dict[str, Any]]:
+        params = {"select": columns, **filters}
+        if limit is not None:
+            params["limit"] = str(limit)
+        response = await self.request("GET", table, params=params)
+        return response.json()
+
+    async def insert(self, table: str, rows: Any) -> List[Dict[str, Any]]:
+        response = await self.request(
+            "POST", table, json=rows, headers={"Prefer": "return=representation"}, idempotent=False
+        )
+        return response.json()
+
+    async def upsert(self, table: str, rows: List[Dict[str, Any]], on_conflict: str = "id") -> None:
+        await self.request(
+            "POST",
+            table,
+            params={"on_conflict": on_conflict},
+            json=rows,
+            headers={"Prefer": "resolution=merge-duplicates,return=minimal"},
+        )
+
+    async def delete(self, table: str, column: str, values: List[Any]) -> None:
+        in_list = ",".join(str(value) for value in values)
+        await self.request("DELETE", table, params={column: f"in.({in_list})"}, headers={"Prefer": "return=minimal"})
+
+    async def health(self) -> Dict[str, str]:
+        """Statut de connexion, vérifié au plus une fois par `health_ttl` secondes.
+
+        Les appels concurrents pendant une vérification attendent son résultat
+        au lieu de lancer chacun leur propre requête.
+        """
+        async with self._health_lock:
+            if self._health is not None and time.monotonic() - self._health_checked_at < self.health_ttl:
+                return self._health
+            try:
+                await self.select(self.health_table, limit=1)
+                self._health = {"status": "connected", "message": "Connexion Supabase réussie"}
+            except SupabaseError as e:
+                self._health = {"status": "error", "message": f"Erreur de connexion: {str(e)}"}
+            self._health_checked_at = time.monotonic()
+            return self._health
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+def create_supabase_client() -> Optional[SupabaseClient]:
+    """Construit le client à partir de SUPABASE_URL / SUPABASE_KEY (None si non configuré)."""
+    url = os.getenv("SUPABASE_URL")
+    key = os.getenv("SUPABASE_KEY")
+    if not url or not key:
+        return None
+    return SupabaseClient(url, key)
@@ -0,0 +1,67 @@
+"""
+Serveur local imitant l'API REST (PostgREST) de Supabase, pour les tests et le développement.
+
+Usage:
+    uvicorn supabase_stub:app --port 54321
+    SUPABASE_URL=http://localhost:54321 SUPABASE_KEY=stub uvicorn main:app
+"""
+from typing import Any, Dict, List
+
+from fastapi import FastAPI, Request, Response
+
+app = FastAPI(title="Supabase stub")
+
+# Tables en mémoire: {table: {clé primaire: ligne}}
+tables: Dict[str, Dict[Any, Dict[str, Any]]] = {}
+
+
+def _rows(table: str) -> List[Dict[str, Any]]:
+    return list(tables.get(table, {}).values())
+
+
+def _parse_in(value: str) -> List[str]:
+    # Format PostgREST: in.(1,2,3)
+    return value[len("in.("):-1].split(",") if value.startswith("in.(") else [value.removeprefix("eq.")]
+
+
+@app.get("/rest/v1/{table}")
+def select(table: str, request: Request):
+    rows = _rows(table)
+    for column, value in request.query_params.items():
+        if column in ("select", "limit", "order"):
+            continue
+        wanted = _parse_in(value)
+        rows = [row for row in rows if str(row.get(column)) in wanted]
+    limit = request.query_params.get("limit")
+    return rows[: int(limit)] if limit else rows
+
+
+@app.post("/rest/v1/{table}")
+async def insert(table: str, request: Request):
+    payload = await request.json()
+    rows = payload if isinstance(payload, list) else [payload]
+    store = tables.setdefault(table, {})
+    merge = "merge-duplicates" in request.headers.get("prefer", "")
+    key = request.query_params.get("on_conflict", "id")
+    created = []
+    for row in rows:
+        row = dict(row)
+        row.setdefault("id", len(store) + 1)
+        if row[key] in store and not merge:
+            return Response(status_code=409, content='{"message": "duplicate key"}', media_type="application/json")
+        store[row[key]] = {**store.get(row[key], {}), **row}
+        created.append(store[row[key]])
+    if "return=minimal" in request.headers.get("prefer", ""):
+        return Response(status_code=201)
+    return created
+
+
+@app.delete("/rest/v1/{table}")
+def delete(table: str, request: Request):
+    store = tables.get(table, {})
+    for column, value in request.query_params.items():
+        wanted = _parse_in(value)
+        for key, row in list(store.items()):
+            if str(row.get(column)) in wanted:
+                del store[key]
+    return Response(status_code=204)
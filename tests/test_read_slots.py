@@ -0,0 +1,60 @@
+"""Places du groupe lectures: les réponses servies par le cache ne font pas la queue."""
+import asyncio
+
+import httpx
+
+import concurrency
+import main
+import seed_data
+
+DAY = "2025-03-22"
+BURST = 300
+
+
+def send(*requests):
+    """Envoie les requêtes (méthode, chemin, json) en même temps à l'application."""
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://test") as client:
+            return await asyncio.gather(*(client.request(method, path, json=body) for method, path, body in requests))
+    return asyncio.run(run())
+
+
+def setup_module():
+    seed_data.seed_months()
+    day = {
+        "date": DAY, "title": "Jour", "month_id": 1,
+        "morning_verse": "Texte du matin", "morning_author": "A", "morning_reference": "R1",
+        "evening_verse": "Texte du soir", "evening_author": "B", "evening_reference": "R2",
+    }
+    [response] = send(("POST", "/readings/daily/", day))
+    assert response.status_code == 201
+
+
+def tight_read_limit(monkeypatch) -> concurrency.ConcurrencyLimit:
+    # Une seule place et aucune file: toute lecture qui attendrait une place serait délestée
+    limit = concurrency.ConcurrencyLimit("read", 1, 0)
+    monkeypatch.setitem(concurrency.limits, "read", limit)
+    return limit
+
+
+def test_cache_hits_are_never_shed(monkeypatch):
+    main.invalidate_payloads()
+    [warm] = send(("GET", f"/readings/{DAY}", None))
+    assert warm.status_code == 200
+    limit = tight_read_limit(monkeypatch)
+
+    responses = send(*[("GET", f"/readings/{DAY}", None)] * BURST)
+
+    assert [response.status_code for response in responses] == [200] * BURST
+    assert limit._semaphore is None
+
+
+def test_cache_miss_takes_a_read_slot(monkeypatch):
+    main.invalidate_payloads()
+    limit = tight_read_limit(monkeypatch)
+
+    [response] = send(("GET", f"/readings/{DAY}", None))
+
+    assert response.status_code == 200
+    assert limit._semaphore is not None
+    assert limit.in_flight == 0
@@ -0,0 +1,66 @@
+"""
+Script pour entraîner un dictionnaire zstd sur les passages et recompresser la table passages.
+
+    PASSAGE_STORAGE=zstd python train_passage_dictionary.py
+    python train_passage_dictionary.py --recompress   # réécrit selon PASSAGE_STORAGE (ex. retour au texte)
+"""
+import os
+import sys
+from datetime import datetime, timezone
+
+from sqlalchemy import bindparam, select, update
+
+from database import SessionLocal, engine
+import models
+import passage_storage
+from passage_storage import dictionaries
+
+DICTIONARY_SIZE = int(os.getenv("PASSAGE_ZSTD_DICT_SIZE", str(64 * 1024)))
+BATCH_SIZE = 500
+
+
+def train_dictionary(db) -> int:
+    """Entraîne un dictionnaire sur tous les passages, l'enregistre et retourne son id."""
+    samples = [content.encode("utf-8") for content in db.scalars(select(models.Passage.content))]
+    dictionary = passage_storage.zstandard.train_dictionary(DICTIONARY_SIZE, samples)
+    dictionary_id = dictionary.dict_id()
+    db.merge(models.CompressionDictionary(id=dictionary_id, data=dictionary.as_bytes(), created_at=datetime.now(timezone.utc)))
+    db.commit()
+    dictionaries.load(db.get_bind())
+    return dictionary_id
+
+
+def recompress_passages(db) -> int:
+    """Réécrit chaque passage dans la forme de stockage courante (dernier dictionnaire)."""
+    table = models.Passage.__table__
+    statement = update(table).where(table.c.hash == bindparam("passage")).values(content=bindparam("text"))
+    hashes = db.scalars(select(models.Passage.hash).order_by(models.Passage.hash)).all()
+    for start in range(0, len(hashes), BATCH_SIZE):
+        batch = hashes[start:start + BATCH_SIZE]
+        rows = db.execute(select(models.Passage.hash, models.Passage.content).where(models.Passage.hash.in_(batch))).all()
+        db.execute(statement, [{"passage": row.hash, "text": row.content} for row in rows])
+        db.commit()
+    return len(hashes)
+
+
+def main():
+    db = SessionLocal()
+    try:
+        if "--recompress" not in sys.argv:
+            if passage_storage.PASSAGE_STORAGE != "zstd":
+                print("[ERROR] PASSAGE_STORAGE=zstd requis pour entraîner un dictionnaire.")
+                return
+            dictionary_id = train_dictionary(db)
+            print(f"[INFO] Dictionnaire {dictionary_id} entraîné ({DICTIONARY_SIZE} octets max).")
+        count = recompress_passages(db)
+        print(f"[SUCCESS] {count} passages réécrits en mode {passage_storage.PASSAGE_STORAGE}.")
+    except Exception as e:
+        print(f"[ERROR] Erreur lors de l'entraînement: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    models.Base.metadata.create_all(bind=engine)
+    main()
@@ -0,0 +1,82 @@
+"""
+Versionnement des lignes pour la synchronisation delta (/sync).
+
+Chaque flush qui crée, modifie ou supprime des mois, jours, lectures ou livres
+avance une horloge globale (`change_clock`) et estampille les lignes touchées
+avec sa nouvelle valeur; les suppressions laissent une ligne dans `tombstones`.
+L'horloge étant une ligne verrouillée jusqu'au commit, les versions deviennent
+visibles dans l'ordre: un client qui a vu la version N a vu tout ce qui précède.
+"""
+from datetime import datetime, timezone
+from typing import Iterable
+
+from sqlalchemy import event, inspect, insert, select, update
+from sqlalchemy.orm import Session
+
+import models
+
+VERSIONED_MODELS = (models.Month, models.Book, models.Day, models.Reading)
+VERSIONED_TABLES = {model.__tablename__: model for model in VERSIONED_MODELS}
+
+_clock = models.ChangeClock.__table__
+
+
+def row_columns(model) -> list:
+    """Colonnes publiques d'un modèle versionné, nommées comme ses attributs.
+
+    Les colonnes de stockage privées (`_passage_hash`, ...) sont remplacées par les
+    attributs calculés correspondants (`Reading.content`, ...).
+    """
+    return [
+        attribute.expression.label(attribute.key)
+        for attribute in inspect(model).column_attrs
+        if not attribute.key.startswith("_")
+    ]
+
+
+def next_version(session: Session) -> int:
+    """Avance l'horloge globale et retourne la nouvelle valeur (verrouille la ligne jusqu'au commit)."""
+    connection = session.connection()
+    version = connection.execute(
+        update(_clock).where(_clock.c.id == 1).values(value=_clock.c.value + 1).returning(_clock.c.value)
+    ).scalar()
+    if version is None:
+        connection.execute(insert(_clock).values(id=1, value=1))
+        version = 1
+    return version
+
+
+def current_version(session: Session) -> int:
+    return session.execute(select(_clock.c.value).where(_clock.c.id == 1)).scalar() or 0
+
+
+def stamp(version: int) -> dict:
+    """Valeurs à inclure dans les INSERT/UPDATE faits hors de l'ORM."""
+    return {"version": version, "updated_at": datetime.now(timezone.utc)}
+
+
+def record_tombstones(session: Session, table_name: str, row_ids: Iterable[int], version: int) -> None:
+    """Enregistre des suppressions faites hors de l'ORM (DELETE en masse)."""
+    now = datetime.now(timezone.utc)
+    rows = [{"table_name": table_name, "row_id": row_id, "version": version, "deleted_at": now} for row_id in row_ids]
+    if rows:
+        session.execute(insert(models.Tombstone), rows)
+
+
+@event.listens_for(Session, "before_flush")
+def _stamp_versions(session: Session, flush_context, instances) -> None:
+    written = [obj for obj in session.new if isinstance(obj, VERSIONED_MODELS)]
+    written += [
+        obj for obj in session.dirty
+        if isinstance(obj, VERSIONED_MODELS) and session.is_modified(obj, include_collections=False)
+    ]
+    deleted = [obj for obj in session.deleted if isinstance(obj, VERSIONED_MODELS)]
+    if not written and not deleted:
+        return
+    version = next_version(session)
+    now = datetime.now(timezone.utc)
+    for obj in written:
+        obj.version = version
+        obj.updated_at = now
+    for obj in deleted:
+        session.add(models.Tombstone(table_name=obj.__tablename__, row_id=obj.id, version=version, deleted_at=now))